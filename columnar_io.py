@@ -0,0 +1,122 @@
+import csv
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# 列式格式依赖pandas和pyarrow（可选）
+pandas_available = False
+try:
+    import pandas as pd
+    pandas_available = True
+except ImportError:
+    pd = None
+
+pyarrow_available = False
+try:
+    import pyarrow  # noqa: F401  pandas的Parquet/Feather读写引擎
+    pyarrow_available = True
+except ImportError:
+    pass
+
+# 可选的结果文件格式，auto按输出文件扩展名选择
+OUTPUT_FORMATS = ['auto', 'csv', 'parquet', 'feather']
+
+# 扩展名与格式的对应关系
+FORMAT_EXTENSIONS = {
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.feather': 'feather',
+    '.arrow': 'feather',
+}
+
+# 文件头魔数，用于识别不依赖扩展名的文件（如.tmp快照）
+PARQUET_MAGIC = b'PAR1'
+ARROW_MAGIC = b'ARROW1'
+
+
+def columnar_available():
+    """当前环境是否可以读写Parquet/Feather"""
+    return pandas_available and pyarrow_available
+
+
+def resolve_format(output_format, path):
+    """将格式名称解析为实际使用的格式，auto按扩展名选择，依赖缺失时回退到csv"""
+    if not output_format or output_format == 'auto':
+        output_format = FORMAT_EXTENSIONS.get(os.path.splitext(path)[1].lower(), 'csv')
+    if output_format != 'csv' and not columnar_available():
+        logger.warning(f"{output_format}格式需要安装pandas和pyarrow，回退到csv")
+        return 'csv'
+    return output_format
+
+
+def detect_format(path):
+    """根据文件头判断文件格式"""
+    with open(path, 'rb') as f:
+        head = f.read(6)
+    if head.startswith(PARQUET_MAGIC):
+        return 'parquet'
+    if head.startswith(ARROW_MAGIC):
+        return 'feather'
+    return 'csv'
+
+
+def domains_frame(items):
+    """由(域名, 项目URL)构建DataFrame，项目URL使用分类类型（写出时为字典编码）"""
+    frame = pd.DataFrame.from_records(list(items), columns=['domain', 'url'])
+    frame['domain'] = frame['domain'].astype(str)
+    frame['url'] = frame['url'].astype('category')
+    return frame
+
+
+def write_domains(items, path, output_format):
+    """将(域名, 项目URL)写入结果文件；columnar格式按域名排序并对项目URL做字典编码"""
+    if output_format == 'csv':
+        with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['domain', 'url'])
+            writer.writerows(items)
+        return
+    frame = domains_frame(items).sort_values('domain', ignore_index=True)
+    if output_format == 'parquet':
+        frame.to_parquet(path, index=False)
+    elif output_format == 'feather':
+        frame.to_feather(path)
+    else:
+        raise ValueError(f"不支持的结果文件格式: {output_format}")
+
+
+def read_domains(path):
+    """向量化读取任意格式的结果文件，返回domain和url两列的DataFrame（url为分类类型）"""
+    file_format = detect_format(path)
+    if file_format == 'parquet':
+        frame = pd.read_parquet(path, columns=['domain', 'url'])
+    elif file_format == 'feather':
+        frame = pd.read_feather(path, columns=['domain', 'url'])
+    else:
+        frame = pd.read_csv(path, usecols=['domain', 'url'], dtype={'domain': str, 'url': 'category'},
+                            keep_default_na=False)
+    if frame['url'].dtype.name != 'category':
+        frame['url'] = frame['url'].astype('category')
+    return frame
+
+
+def load_domain_map(path):
+    """读取结果文件为{域名: 项目URL}"""
+    frame = read_domains(path)
+    return dict(zip(frame['domain'], frame['url'].astype(str)))
+
+
+def diff_domains(old, new):
+    """比较两个结果DataFrame，返回domain、url、old_url、change列的DataFrame，change为added/removed/moved"""
+    old = old.drop_duplicates('domain', keep='last').astype({'url': str})
+    new = new.drop_duplicates('domain', keep='last').astype({'url': str})
+    merged = new.merge(old, on='domain', how='outer', suffixes=('', '_old'), indicator=True)
+    merged = merged.rename(columns={'url_old': 'old_url'})
+    merged['change'] = None
+    merged.loc[merged['_merge'] == 'left_only', 'change'] = 'added'
+    merged.loc[merged['_merge'] == 'right_only', 'change'] = 'removed'
+    moved = (merged['_merge'] == 'both') & (merged['url'] != merged['old_url'])
+    merged.loc[moved, 'change'] = 'moved'
+    diff = merged[merged['change'].notna()][['domain', 'url', 'old_url', 'change']]
+    return diff.sort_values(['change', 'domain'], ignore_index=True)
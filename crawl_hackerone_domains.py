@@ -1,12 +1,14 @@
-from bs4 import BeautifulSoup
 import time
 import random
-import csv
 import argparse
 import os
 from urllib.parse import urljoin
 import logging
 import threading
+import queue
+import multiprocessing
+import asyncio
+from contextlib import asynccontextmanager
 import requests
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
@@ -18,6 +20,22 @@ from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 import json
 import http.client
+from columnar_io import OUTPUT_FORMATS, diff_domains, domains_frame, read_domains, resolve_format, write_domains
+from crawl_state import CheckpointJournal, FingerprintStore, ProgressLog, parse_timestamp
+from http_cache import DEFAULT_MAX_AGE, DEFAULT_MAX_SIZE, ResponseCache
+from http_session import SessionPool
+from lean_profile import DEFAULT_BLOCKED_RESOURCE_TYPES, LeanProfile
+from page_extraction import EXTRACT_FUNCTION, ExtractedPage, extract_args
+from page_readiness import (DEFAULT_QUIET_MS, DEFAULT_READY_TIMEOUT, is_listing_url, ready_selectors,
+                            scroll_until_stable, scroll_until_stable_async, selenium_evaluate, wait_ready_playwright,
+                            wait_ready_playwright_async, wait_ready_selenium)
+from rate_limiter import RateLimiter, parse_retry_after
+from response_capture import PERFORMANCE_LOG_CAPABILITY, CapturedPage, PlaywrightCapture, SeleniumCapture
+from sqlite_store import SqliteStore
+from parser_backend import (PARSER_ENGINES, domains_fingerprint, fast_program_listing, fast_scope_domains,
+                            fast_listing_totals, fast_scope_fingerprint, link_set_fingerprint, listing_from_payloads, listing_totals, parse_html, payload_kind, programs_from_api,
+                            resolve_engine, resolve_scope, scope_from_api, scope_from_payloads)
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -27,10 +45,19 @@ logger = logging.getLogger(__name__)
 playwright_available = False
 try:
     from playwright.sync_api import sync_playwright
+    from playwright.async_api import async_playwright
     playwright_available = True
 except ImportError:
     logger.warning("未安装Playwright，无法使用Playwright模拟登录功能。请运行 'pip install playwright' 安装")
 
+# 尝试导入aiohttp（异步HTTP请求）
+aiohttp_available = False
+try:
+    import aiohttp
+    aiohttp_available = True
+except ImportError:
+    aiohttp = None
+
 # 设置请求头，模拟浏览器
 USER_AGENTS = [
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -41,12 +68,72 @@ USER_AGENTS = [
 # 设置请求延迟范围
 REQUEST_DELAY = (1, 3)  # 随机延迟范围（秒）
 
+# 异步模式下Playwright页面池的默认大小
+ASYNC_BROWSER_PAGES = 8
+
+# Playwright浏览器启动参数
+PLAYWRIGHT_LAUNCH_ARGS = [
+    '--disable-gpu',
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-extensions',
+    '--ignore-certificate-errors'
+]
+
 # 代理列表格式: [{'http': 'http://proxy:port', 'https': 'https://proxy:port'}, ...]
 PROXIES = [
     # 添加你的代理服务器，例如:
     # {'http': 'http://127.0.0.1:8080', 'https': 'https://127.0.0.1:8080'},
 ]
 
+# GraphQL查询：众测项目列表（/opportunities/all页面背后的数据）
+OPPORTUNITIES_QUERY = '''
+query DiscoveryQuery($query: OpportunitiesQuery!, $filter: QueryInput!, $from: Int, $size: Int, $sort: [SortInput!], $post_filters: OpportunitiesFilterInput) {
+  opportunities_search(query: $query, filter: $filter, from: $from, size: $size, sort: $sort, post_filters: $post_filters) {
+    nodes {
+      ... on OpportunityDocument {
+        id
+        handle
+        name
+        last_updated_at
+      }
+    }
+    total_count
+  }
+}
+'''
+
+# GraphQL查询：项目的范围资产（项目scope页面背后的数据）
+STRUCTURED_SCOPES_QUERY = '''
+query PolicySearchStructuredScopesQuery($handle: String!, $searchString: String, $eligibleForSubmission: Boolean, $from: Int, $size: Int) {
+  team(handle: $handle) {
+    structured_scopes_search(search_string: $searchString, eligible_for_submission: $eligibleForSubmission, from: $from, size: $size) {
+      nodes {
+        ... on StructuredScopeDocument {
+          identifier
+          display_name
+          asset_type
+          eligible_for_submission
+        }
+      }
+      total_count
+    }
+  }
+}
+'''
+
+# API模式下每次请求的条目数
+API_PAGE_SIZE = 100
+
+# DEBUG日志级别下保存列表页内容的调试文件（hackerone_page.html是解析器的参考页面，不能覆盖）
+DEBUG_PAGE_FILE = 'hackerone_page_debug.html'
+
+# 列表页预取窗口的默认大小
+LISTING_WINDOW = 4
+
+# 列表发现与详情爬取之间最多缓冲的项目链接数，缓冲区满时暂停获取列表页
+PROGRAM_BUFFER_SIZE = 200
+
 # 日志级别映射
 LOG_LEVELS = {
     'DEBUG': logging.DEBUG,
@@ -60,19 +147,89 @@ class HackerOneScraper:
                  progress_interval=10, log_level=logging.INFO, driver_path=None, chrome_path=None,
                  use_firecrawl=False, firecrawl_api_key=None, use_playwright=False,
                  playwright_login=False, username=None, password=None, use_mcp_playwright=False,
-                 use_mcp_firecrawl=False, mcp_host='localhost', mcp_port=8000):
-        self.base_url = 'https://hackerone.com'
+                 use_mcp_firecrawl=False, mcp_host='localhost', mcp_port=8000, workers=1,
+                 use_async=False, concurrency=50, pool_size=10, http_retries=3, playwright_pages=None,
+                 selenium_drivers=1, driver_max_pages=50, processes=1, parser_engine='auto',
+                 use_api=False, api_page_size=API_PAGE_SIZE, base_url='https://hackerone.com',
+                 cache_dir=None, max_cache_age=DEFAULT_MAX_AGE, max_cache_size=DEFAULT_MAX_SIZE,
+                 since=None, full_recrawl=False, store='csv', output_format='auto', diff_against=None,
+                 rps=None, per_host_rps=None, max_rps=None, ready_quiet_ms=DEFAULT_QUIET_MS,
+                 ready_timeout=DEFAULT_READY_TIMEOUT, lean=False, block_resources=None, block_hosts=None,
+                 capture_json=False, extract_in_page=False, listing_window=LISTING_WINDOW):
+        # 保存构造参数，多进程模式下工作进程用它重建自己的爬虫实例
+        self._init_kwargs = {k: v for k, v in locals().items() if k != 'self'}
+        # 先初始化日志，后续的配置检查都会用到
+        self.logger = logger
+        self.logger.setLevel(log_level)
+        self.base_url = base_url.rstrip('/')
         # 更改为正确的众测项目URL
         self.programs_url = f'{self.base_url}/opportunities/all'
+        self.graphql_url = f'{self.base_url}/graphql'
+        # API模式：直接请求列表和范围页面背后的GraphQL数据，不渲染HTML
+        self.use_api = use_api
+        self.api_page_size = api_page_size
+        self._csrf_token = None
         self.output_file = output_file
         self.domains = set()  # 使用集合避免重复
         self.domain_url_map = {}  # 存储域名和URL的对应关系
+        # 使用数据库存储时域名保存在数据库中，指纹和检查点在内存中不再保留每个项目的域名
+        keep_domains = not store or store == 'csv'
+        # 增量爬取：上次运行记录的每个项目的范围指纹和域名，范围未变化的项目不再重新解析
+        self.fingerprints = FingerprintStore(f"{output_file}.fingerprints.json", keep_domains=keep_domains)
+        self.full_recrawl = full_recrawl  # 忽略已有指纹，重新爬取和解析所有项目
+        self.since = parse_timestamp(since)  # 只爬取列表中标记为在此时间之后更新过的项目
+        if since and self.since is None:
+            self.logger.warning(f"无法解析时间 {since}，将忽略--since参数")
+        self.program_updated_at = {}  # 列表页/API中每个项目的更新时间
+        self.unchanged_count = 0  # 本次运行中复用指纹记录的项目数
+        # 检查点日志：记录已获取的列表页和已完成/失败的项目，中断后重新运行时从断点继续
+        self.checkpoint = CheckpointJournal(f"{output_file}.checkpoint", keep_domains=keep_domains)
+        # 进度保存：新记录追加到<output>.wal，定期压缩进<output>.tmp快照，不再每次重写全部结果
+        self.output_format = resolve_format(output_format, output_file)  # 结果文件格式: csv/parquet/feather
+        self.diff_against = diff_against  # 爬取完成后与此结果文件比较
+        self.progress_log = ProgressLog(f"{output_file}.tmp", f"{output_file}.wal", snapshot_format=self.output_format)
+        self._pending_records = []  # 上次保存进度后新增或变化的(域名, 项目URL)
+        # 结果存储后端：csv（默认，进度保存在快照和追加日志中）或 sqlite:路径（CSV仅作为导出）
+        self.store = None
+        if store and store != 'csv':
+            backend, _, store_path = store.partition(':')
+            if backend != 'sqlite' or not store_path:
+                raise ValueError(f"不支持的存储后端: {store}，可选值为 csv 或 sqlite:路径")
+            self.store = SqliteStore(store_path)
+            self.logger.info(f"使用SQLite存储结果: {store_path}")
         # 添加一个测试条目以验证功能
         self.domain_url_map['example.com'] = 'https://www.example.com'
         self.use_proxy = use_proxy
         self.proxy_list = proxy_list if proxy_list else PROXIES
         self.proxy_lock = threading.Lock()  # 用于保护代理列表的线程锁
+        self.result_lock = threading.Lock()  # 用于保护domains和domain_url_map的线程锁
+        self.fetch_lock = threading.Lock()  # 用于串行化共享浏览器实例的访问
+        self.workers = max(1, workers)  # 并发爬取项目详情的线程数
+        self.listing_window = max(1, listing_window)  # 列表页预取窗口：不知道总页数时最多同时获取的页数
+        self.use_async = use_async  # 是否使用asyncio异步爬取
+        self.concurrency = max(1, concurrency)  # 异步模式下的最大并发请求数
+        self.processes = max(1, processes)  # 多进程模式下的工作进程数
+        self.parser_engine = resolve_engine(parser_engine)  # HTML解析引擎
+        self.logger.info(f"使用HTML解析引擎: {self.parser_engine}")
         self.request_delay = request_delay
+        # 自适应限速器：取代每次请求后的固定随机等待
+        # 默认起始速率为平均请求间隔的倒数乘以同时进行的请求数，每个并发单位保持原来单线程的节奏
+        mean_delay = sum(request_delay) / len(request_delay) if request_delay else 0
+        if rps is None and mean_delay > 0:
+            rps = self.effective_concurrency(playwright_pages, selenium_drivers) / mean_delay
+        if max_rps is None and rps:
+            max_rps = rps * 10  # 服务端响应正常时最多提速到起始速率的10倍
+        self.rate_limiter = RateLimiter(rps, per_host_rps, max_rps)
+        # 页面就绪判定：关键元素出现且DOM静默ready_quiet_ms毫秒即返回，最多等待ready_timeout秒
+        self.ready_quiet_ms = ready_quiet_ms
+        self.ready_timeout = ready_timeout
+        # 精简渲染模式：浏览器不加载图片、字体等资源和第三方统计脚本，导航只等待DOM就绪
+        self.lean_profile = LeanProfile(block_resources, block_hosts) if lean else None
+        self.page_wait_until = self.lean_profile.wait_until if self.lean_profile else 'networkidle'
+        # 响应捕获模式：浏览器后端直接返回页面加载期间捕获的项目列表/范围JSON，不再序列化整个DOM
+        self.capture_json = capture_json
+        # 页面内提取模式：在浏览器中运行提取脚本，只把范围候选文本和项目链接传回Python
+        self.extract_in_page = extract_in_page
         self.max_retries = max_retries
         self.backoff_factor = backoff_factor
         self.progress_interval = progress_interval
@@ -92,6 +249,13 @@ class HackerOneScraper:
         self.page = None
         self.context = None
         self.cookies = None
+        self.storage_state = None  # 登录后的浏览器存储状态（Cookie和localStorage）
+        # Playwright页面池（同一个Chromium实例中的多个上下文/页面）
+        self.playwright_pages = playwright_pages
+        self.page_pool = None
+        self._pool_loop = None  # 同步模式下运行页面池的后台事件循环
+        # 异步后端实例
+        self._aiohttp_session = None
 
         # 检查Firecrawl配置
         if self.use_firecrawl:
@@ -114,10 +278,20 @@ class HackerOneScraper:
             import os
             self.chrome_path = os.environ.get('CHROME_PATH')
         self.driver = None  # WebDriver实例
-        # 更新日志级别
-        self.logger = logger  # 先将全局logger赋值给实例属性
-        self.logger.setLevel(self.log_level)  # 然后使用实例属性设置日志级别
+        self.driver_pool = None  # WebDriver池（selenium_drivers大于1时使用）
         self.logger.info("初始化HackerOneScraper")
+        # 基于连接池的HTTP会话，每个代理一个连接池，连接数至少覆盖所有工作线程
+        self.session_pool = SessionPool(
+            pool_size=max(pool_size, self.workers),
+            retries=http_retries,
+            backoff_factor=self.backoff_factor,
+            headers=self.get_random_headers()
+        )
+        # 磁盘响应缓存（HTTP路径），未指定缓存目录时不启用
+        self.response_cache = None
+        if cache_dir:
+            self.response_cache = ResponseCache(cache_dir, max_age=max_cache_age, max_size=max_cache_size, logger=self.logger)
+            self.logger.info(f"启用响应缓存: {cache_dir} (有效期 {max_cache_age} 秒)")
         # 优先使用ChromeDriver，因为它能处理JavaScript渲染
         self.logger.info("提示：HackerOne是一个需要JavaScript的单页应用，建议使用ChromeDriver或Playwright模式")
         
@@ -143,9 +317,14 @@ class HackerOneScraper:
         if self.use_playwright:
             self.setup_playwright()
         # 设置Selenium WebDriver（如果未启用Playwright）
-        elif not self.use_firecrawl:
+        elif not self.use_firecrawl and not self.use_api:
             try:
-                self.driver = self.setup_driver()
+                if selenium_drivers > 1:
+                    self.driver_pool = WebDriverPool(self.setup_driver, size=selenium_drivers,
+                                                     max_pages=driver_max_pages, logger=self.logger)
+                    self.driver_pool.start()
+                else:
+                    self.driver = self.setup_driver()
                 self.logger.info("WebDriver初始化成功")
             except Exception as e:
                 self.logger.error(f"WebDriver初始化失败: {e}")
@@ -192,6 +371,9 @@ class HackerOneScraper:
             self.context = self.browser.new_context(
                 viewport={'width': 1920, 'height': 1080}
             )
+            if self.lean_profile:
+                self.lean_profile.install_playwright(self.context)
+                self.logger.info("已启用精简渲染模式")
             
             # 创建新的页面
             self.page = self.context.new_page()
@@ -240,7 +422,10 @@ class HackerOneScraper:
                 
                 # 保存Cookie，以便后续请求使用
                 self.cookies = self.context.cookies()
+                self.storage_state = self.context.storage_state()
                 self.logger.info(f"已保存{len(self.cookies)}个Cookie")
+                # Cookie只需加载一次，之后所有HTTP会话共享
+                self.session_pool.load_cookies(self.cookies)
                 
                 # 如果启用了Firecrawl，可以使用这些Cookie
                 if self.use_firecrawl:
@@ -275,6 +460,8 @@ class HackerOneScraper:
         while retries < max_retries:
             try:
                 self.logger.info(f"使用MCP Playwright访问: {url}")
+                self.rate_limiter.acquire(url)
+                start_time = time.time()
                 
                 # 使用MCP调用Playwright
                 result = self.mcp_playwright.call(
@@ -287,24 +474,16 @@ class HackerOneScraper:
                 )
                 
                 if result and "content" in result:
+                    self.rate_limiter.record(url, elapsed=time.time() - start_time)
                     self.logger.info(f"MCP Playwright获取页面成功: {url}")
                     
-                    # 保存页面内容用于调试
-                    if '/opportunities/all' in url or '/bug-bounty-programs' in url:
-                        debug_file = 'hackerone_mcp_playwright.html'
-                        with open(debug_file, 'w', encoding='utf-8') as f:
-                            f.write(result["content"])
-                        self.logger.info(f"页面内容已保存到 {debug_file}")
-                    
-                    # 添加随机延迟
-                    delay = random.uniform(*self.request_delay)
-                    self.logger.info(f"添加随机延迟: {delay:.2f}秒")
-                    time.sleep(delay)
+                    self.save_debug_page(url, result["content"], 'hackerone_mcp_playwright.html')
                     
                     return result["content"]
                 else:
                         self.logger.error(f"MCP Playwright返回无效结果: {url}")
             except Exception as e:
+                self.rate_limiter.record(url, error=True)
                 retries += 1
                 self.logger.error(f"MCP Playwright请求出错 (第 {retries}/{max_retries} 次尝试): {url}, 错误: {e}")
                 
@@ -320,51 +499,63 @@ class HackerOneScraper:
         
         return None
         
-    def playwright_get(self, url, max_retries=3):
-        """使用Playwright获取页面内容"""
+    def playwright_get(self, url, max_retries=3, listing=None):
+        """使用Playwright获取页面内容，listing为列表页获取的状态（接收滚动中新出现的项目链接）"""
+        # 启用页面池时，借出一个空闲页面在后台事件循环中渲染
+        if self.page_pool and self._pool_loop:
+            return self._pool_loop.run(self.async_playwright_get(url, max_retries, listing))
+
         if not self.page:
             self.logger.error("Playwright页面未初始化")
             return None
         
         retries = 0
         while retries < max_retries:
+            capture = None
             try:
                 self.logger.info(f"使用Playwright访问: {url}")
+                self.rate_limiter.acquire(url)
+                start_time = time.time()
+                if self.capture_json:
+                    capture = PlaywrightCapture(self.page).start()
                 
                 # 导航到URL
-                self.page.goto(url, wait_until="networkidle")
+                response = self.page.goto(url, wait_until=self.page_wait_until)
+                self.rate_limiter.record(url, status=response.status if response else None,
+                                         elapsed=time.time() - start_time)
                 
-                # 等待页面加载完成
-                wait_time = random.uniform(3, 8)
-                self.logger.info(f"等待{wait_time:.2f}秒确保内容加载完成")
-                time.sleep(wait_time)
-                
-                # 如果是opportunities页面，确保内容加载
-                if '/opportunities/all' in url:
-                    # 滚动页面以加载更多内容
-                    self.logger.info("滚动页面以加载更多众测项目...")
-                    # 尝试滚动几次
-                    for _ in range(3):
-                        self.page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                        time.sleep(2)
+                # 等待页面渲染完成，如果是列表页，滚动到不再出现新的项目卡片为止
+                # 就绪判定出错（如客户端跳转后执行上下文被销毁）时直接使用当前页面内容，不算作请求失败
+                selectors = ready_selectors(url)
+                try:
+                    self.log_readiness(url, wait_ready_playwright(self.page, selectors, self.ready_quiet_ms, self.ready_timeout))
+                    if is_listing_url(url):
+                        self.logger.info("滚动页面以加载更多众测项目...")
+                        self.scroll_listing(self.page.evaluate, lambda: wait_ready_playwright(
+                            self.page, selectors, self.ready_quiet_ms, self.ready_timeout), listing)
+                except ListingAborted:
+                    raise
+                except Exception as e:
+                    self.logger.warning(f"等待页面就绪出错，直接使用当前页面内容: {e}")
                 
-                # 保存页面内容用于调试
-                if '/opportunities/all' in url or '/bug-bounty-programs' in url:
-                    debug_file = 'hackerone_opportunities.html'
-                    with open(debug_file, 'w', encoding='utf-8') as f:
-                        f.write(self.page.content())
-                    self.logger.info(f"页面内容已保存到 {debug_file}")
-                    # 检查保存的文件大小
-                    file_size = os.path.getsize(debug_file) / 1024
-                    self.logger.info(f"保存的页面大小: {file_size:.2f} KB")
+                # 捕获到项目列表或范围数据时直接返回，否则序列化页面DOM
+                content = self.captured_page(url, capture.payloads()) if capture else None
+                if content is None and self.extract_in_page:
+                    content = self.extracted_page(url, self.page.evaluate)
+                if content is None:
+                    content = self.page.content()
                 
-                # 添加随机延迟
-                delay = random.uniform(*self.request_delay)
-                self.logger.info(f"添加随机延迟: {delay:.2f}秒")
-                time.sleep(delay)
+                self.save_debug_page(url, content, 'hackerone_opportunities.html')
                 
-                return self.page.content()
+                return content
+            except ListingAborted:
+                if capture:
+                    capture.stop()
+                return None
             except Exception as e:
+                    if capture:
+                        capture.stop()
+                    self.rate_limiter.record(url, error=True)
                     retries += 1
                     self.logger.error(f"Playwright请求出错 (第 {retries}/{max_retries} 次尝试): {url}, 错误: {e}")
                     
@@ -402,6 +593,15 @@ class HackerOneScraper:
         with self.proxy_lock:
             return random.choice(self.proxy_list)
 
+    def apply_lean_profile(self, driver):
+        """精简渲染模式下通过CDP为WebDriver拦截资源，CDP不可用时只保留Chrome偏好设置"""
+        if not self.lean_profile:
+            return
+        try:
+            self.lean_profile.install_selenium(driver)
+        except Exception as e:
+            self.logger.warning(f"通过CDP拦截资源失败，仅使用Chrome偏好设置: {e}")
+
     def setup_driver(self):
         """设置Selenium WebDriver"""
         try:
@@ -428,6 +628,11 @@ class HackerOneScraper:
             chrome_options.add_argument('--ignore-certificate-errors')
             chrome_options.add_argument('--ignore-urlfetcher-cert-requests')
             chrome_options.add_argument('--allow-insecure-localhost')
+            if self.lean_profile:
+                self.lean_profile.apply_chrome_options(chrome_options)
+            if self.capture_json:
+                # 响应捕获依赖性能日志中的Network事件
+                chrome_options.set_capability(*PERFORMANCE_LOG_CAPABILITY)
 
             # 如果提供了Chrome路径，设置二进制位置
             if self.chrome_path:
@@ -472,6 +677,7 @@ class HackerOneScraper:
                 service = Service(executable_path=driver_path)
                 driver = webdriver.Chrome(service=service, options=chrome_options)
                 self.logger.info("WebDriver初始化成功，使用webdriver_manager自动管理的ChromeDriver")
+                self.apply_lean_profile(driver)
                 # 增加页面加载超时设置
                 driver.set_page_load_timeout(60)
                 return driver
@@ -530,6 +736,7 @@ class HackerOneScraper:
 
                 driver = webdriver.Chrome(service=service, options=chrome_options)
                 self.logger.info(f"WebDriver初始化成功，使用路径: {driver_path}")
+                self.apply_lean_profile(driver)
                 # 增加页面加载超时设置
                 driver.set_page_load_timeout(60)
                 return driver
@@ -544,8 +751,413 @@ class HackerOneScraper:
             self.logger.error(f"设置WebDriver失败: {e}")
             raise
 
-    def send_request(self, url, max_retries=3):
-        """发送请求，支持MCP Playwright、Playwright、Selenium和Firecrawl三种模式"""
+    def get_http_session(self):
+        """获取HTTP会话，启用代理时随机选择代理对应的连接池"""
+        proxy = None
+        if self.use_proxy and self.proxy_list:
+            proxy = self.get_random_proxy()
+        return self.session_pool.get(proxy), proxy
+
+    def limited_get(self, session, url, **kwargs):
+        """经过限速器发送GET请求，并把响应状态和耗时反馈给限速器"""
+        self.rate_limiter.acquire(url)
+        start_time = time.time()
+        try:
+            response = session.get(url, **kwargs)
+        except Exception:
+            self.rate_limiter.record(url, error=True)
+            raise
+        self.rate_limiter.record(url, status=response.status_code, elapsed=time.time() - start_time,
+                                 retry_after=parse_retry_after(response.headers.get('Retry-After')))
+        return response
+
+    def cached_http_get(self, session, url, timeout):
+        """发送GET请求并返回(正文, 是否来自缓存)；启用缓存时有效期内直接返回，过期或是列表页时发送条件请求重新验证"""
+        cache = self.response_cache
+        entry, body = cache.lookup(url) if cache else (None, None)
+        # 列表页会不断出现新项目，每次都发送条件请求重新验证，不在TTL内直接使用
+        if cache and not is_listing_url(url) and cache.is_fresh(entry):
+            cache.touch(url)
+            self.logger.debug(f"缓存命中: {url}")
+            return body, True
+
+        response = self.limited_get(session, url, timeout=timeout,
+                                    headers=cache.conditional_headers(entry) if cache else None)
+        if not cache:
+            response.raise_for_status()
+            return response.text, False
+        if response.status_code == 304 and body is not None:
+            cache.touch(url, mark_fetched=True)
+            self.logger.debug(f"页面未修改，使用缓存: {url}")
+            return body, True
+        response.raise_for_status()
+        cache.store(url, response.text, response.headers)
+        return response.text, False
+
+    def http_get(self, url):
+        """使用连接池化的HTTP会话获取页面内容（Firecrawl模式的简单替代实现）"""
+        # 注意：完整的Firecrawl功能需要API密钥
+        # 这里只是提供一个临时替代方案
+        try:
+            session, proxy = self.get_http_session()
+            if proxy:
+                self.logger.info(f"Firecrawl模式使用代理: {proxy}")
+
+            # 发送请求，增加超时时间到60秒
+            text, from_cache = self.cached_http_get(session, url, 60)
+
+            self.logger.info(f"Firecrawl模式获取页面成功{'（缓存）' if from_cache else ''}: {url}")
+
+            if is_listing_url(url):
+                self.save_debug_page(url, text)
+
+                # 提示用户这个模式的局限性
+                self.logger.warning("注意：HackerOne是一个需要JavaScript的单页应用，Firecrawl模式（简单HTTP请求）可能无法获取完整内容")
+                self.logger.warning("建议：使用ChromeDriver或Playwright模式来确保能够执行JavaScript并获取完整的众测项目列表")
+
+            return text
+        except requests.exceptions.Timeout:
+            self.logger.error(f"Firecrawl模式请求超时: {url}")
+            self.logger.error("可能是网络连接问题或HackerOne网站限制。请检查您的网络连接。")
+            # 尝试增加重试次数，这次使用不同的代理
+            self.logger.info("尝试再次发送请求，使用不同的代理...")
+            try:
+                # 使用不同的代理
+                session, retry_proxy = self.get_http_session()
+                if retry_proxy:
+                    self.logger.info(f"Firecrawl模式重试使用代理: {retry_proxy}")
+
+                text, _ = self.cached_http_get(session, url, 90)
+                self.logger.info(f"重试成功: {url}")
+                return text
+            except Exception as retry_e:
+                self.logger.error(f"重试也失败了: {retry_e}")
+                return None
+        except requests.exceptions.ConnectionError:
+            self.logger.error(f"Firecrawl模式连接错误: {url}")
+            self.logger.error("可能是网络连接问题或代理配置错误。")
+            return None
+        except Exception as e:
+            self.logger.error(f"Firecrawl模式请求失败: {e}")
+            # 如果有Firecrawl API密钥，提示正确的使用方法
+            if hasattr(self, 'firecrawl_api_key') and self.firecrawl_api_key:
+                self.logger.error("提示: 如需使用完整的Firecrawl功能，请配置API密钥并使用官方API。")
+            return None
+
+    def scroll_listing(self, evaluate, wait_ready, listing=None):
+        """滚动加载列表页直到项目链接不再增加，新出现的项目链接立即交给listing的回调
+
+        列表获取已停止时在下一次滚动前抛出ListingAborted
+        """
+        def wait():
+            if listing:
+                listing.check()
+            return wait_ready()
+        for hrefs in scroll_until_stable(evaluate, wait):
+            self.stream_listing_links(hrefs, listing)
+
+    async def scroll_listing_async(self, evaluate, wait_ready, listing=None):
+        """scroll_listing的异步版本，evaluate和wait_ready为协程函数"""
+        async def wait():
+            if listing:
+                listing.check()
+            return await wait_ready()
+        async for hrefs in scroll_until_stable_async(evaluate, wait):
+            self.stream_listing_links(hrefs, listing)
+
+    def stream_listing_links(self, hrefs, listing=None):
+        """将滚动中新出现的链接筛选为项目链接后交给listing的回调"""
+        if not listing or not listing.sink:
+            return
+        program_links = self.program_links_from_hrefs(hrefs)
+        if program_links:
+            listing.sink(program_links)
+
+    def captured_page(self, url, payloads):
+        """从捕获的JSON响应中保留与页面类型相符的数据（列表页保留项目列表，详情页保留范围），没有时返回None"""
+        kind = 'listing' if is_listing_url(url) else 'scope'
+        payloads = [data for data in payloads if payload_kind(data) == kind]
+        if not payloads:
+            self.logger.debug(f"未捕获到{'项目列表' if kind == 'listing' else '范围'}数据，使用页面内容: {url}")
+            return None
+        self.logger.info(f"捕获到 {len(payloads)} 个包含{'项目列表' if kind == 'listing' else '范围'}数据的JSON响应: {url}")
+        return CapturedPage(payloads)
+
+    def _extracted_page(self, url, result):
+        if ExtractedPage.is_empty(result):
+            self.logger.debug(f"页面内提取没有结果，使用页面内容: {url}")
+            return None
+        page = ExtractedPage(result)
+        self.logger.info(f"页面内提取完成，返回 {len(page)} 个字符: {url}")
+        return page
+
+    def extracted_page(self, url, evaluate):
+        """在页面中运行提取脚本，没有可用数据或脚本出错时返回None"""
+        try:
+            result = evaluate(EXTRACT_FUNCTION, extract_args(is_listing_url(url)))
+        except Exception as e:
+            self.logger.warning(f"页面内提取出错，使用页面内容: {url}, 错误: {e}")
+            return None
+        return self._extracted_page(url, result)
+
+    async def extracted_page_async(self, url, evaluate):
+        """extracted_page的异步版本"""
+        try:
+            result = await evaluate(EXTRACT_FUNCTION, extract_args(is_listing_url(url)))
+        except Exception as e:
+            self.logger.warning(f"页面内提取出错，使用页面内容: {url}, 错误: {e}")
+            return None
+        return self._extracted_page(url, result)
+
+    def save_debug_page(self, url, content, debug_file=DEBUG_PAGE_FILE):
+        """DEBUG日志级别下保存列表页内容用于调试，不覆盖仓库中的参考页面"""
+        if not content or not is_listing_url(url) or not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        try:
+            with open(debug_file, 'w', encoding='utf-8') as f:
+                f.write(content)
+            self.logger.debug(f"页面内容已保存到 {debug_file}，大小: {os.path.getsize(debug_file) / 1024:.2f} KB")
+        except OSError as e:
+            self.logger.debug(f"保存调试页面失败: {debug_file}, 错误: {e}")
+
+    def effective_concurrency(self, playwright_pages=None, selenium_drivers=1):
+        """同时进行的详情请求数：异步模式为并发请求数，否则为工作线程数、页面池和WebDriver池大小中的最大值，再乘以进程数"""
+        if self.use_async:
+            concurrency = self.concurrency
+        else:
+            concurrency = max(self.workers, playwright_pages or 1, selenium_drivers or 1)
+        return concurrency * self.processes
+
+    def log_readiness(self, url, result):
+        """记录页面就绪判定的结果"""
+        if not result:
+            self.logger.warning(f"页面就绪判定无结果，直接使用当前页面内容: {url}")
+        elif result.get('ready'):
+            self.logger.info(f"页面已就绪 ({result.get('selector')})，等待{result.get('elapsed', 0) / 1000:.2f}秒: {url}")
+        else:
+            self.logger.warning(f"等待页面就绪超时（{self.ready_timeout}秒），直接使用当前页面内容: {url}")
+
+    def selenium_load(self, driver, url, listing=None):
+        """使用指定的WebDriver加载页面并返回页面源码，出错时抛出异常，列表获取已停止时抛出ListingAborted"""
+        self.logger.info(f"使用Selenium访问: {url}")
+        self.rate_limiter.acquire(url)
+        capture = SeleniumCapture(driver).start() if self.capture_json else None
+        # 记录页面加载开始时间
+        start_time = time.time()
+        try:
+            driver.get(url)
+        except Exception:
+            self.rate_limiter.record(url, error=True)
+            raise
+        self.rate_limiter.record(url, elapsed=time.time() - start_time)
+        # 等待页面加载完成
+        self.logger.info(f"等待页面加载完成: {url}")
+        # 等待body元素出现
+        WebDriverWait(driver, 30).until(
+            EC.presence_of_element_located((By.TAG_NAME, 'body'))
+        )
+        self.logger.info(f"body元素已加载: {url}")
+
+        # 等待关键元素出现且DOM不再变化，列表页再滚动到不再出现新的项目卡片为止
+        selectors = ready_selectors(url)
+        try:
+            self.log_readiness(url, wait_ready_selenium(driver, selectors, self.ready_quiet_ms, self.ready_timeout))
+            if is_listing_url(url):
+                self.scroll_listing(lambda script: selenium_evaluate(driver, script), lambda: wait_ready_selenium(
+                    driver, selectors, self.ready_quiet_ms, self.ready_timeout), listing)
+        except ListingAborted:
+            raise
+        except Exception as e:
+            self.logger.warning(f"等待页面就绪出错，直接使用当前页面内容: {e}")
+
+        # 记录页面加载完成时间
+        load_time = time.time() - start_time
+        self.logger.info(f"页面加载完成，耗时: {load_time:.2f}秒: {url}")
+
+        # 捕获到项目列表或范围数据时直接返回，否则通过WebDriver协议取回整个页面源码
+        content = self.captured_page(url, capture.payloads()) if capture else None
+        if content is None and self.extract_in_page:
+            content = self.extracted_page(url, lambda script, arg: selenium_evaluate(driver, script, arg))
+        if content is None:
+            content = driver.page_source
+
+        self.save_debug_page(url, content)
+
+        return content
+
+    def pooled_selenium_get(self, url, max_retries=3, listing=None):
+        """从WebDriver池借出一个实例加载页面，出错的实例会被回收替换"""
+        retries = 0
+        while retries < max_retries:
+            driver = self.driver_pool.checkout()
+            broken = False
+            try:
+                return self.selenium_load(driver, url, listing)
+            except ListingAborted:
+                return None
+            except WebDriverException as e:
+                retries += 1
+                broken = True
+                self.logger.error(f"WebDriver异常 (第 {retries}/{max_retries} 次尝试): {url}, 错误: {e}")
+            except Exception as e:
+                retries += 1
+                self.logger.error(f"请求出错 (第 {retries}/{max_retries} 次尝试): {url}, 错误: {e}")
+            finally:
+                self.driver_pool.checkin(driver, broken)
+            # 如果还没达到最大重试次数，等待一段时间后重试
+            if retries < max_retries:
+                wait_time = random.uniform(2, 5) * retries  # 指数退避
+                self.logger.info(f"{wait_time:.2f}秒后重试...")
+                time.sleep(wait_time)
+        self.logger.error(f"达到最大重试次数，请求失败: {url}")
+        return None
+
+    def get_csrf_token(self):
+        """获取GraphQL请求所需的CSRF令牌，只请求一次"""
+        if self._csrf_token is None:
+            try:
+                session, _ = self.get_http_session()
+                response = self.limited_get(session, f'{self.base_url}/current_user',
+                                            headers={'Accept': 'application/json'}, timeout=30)
+                response.raise_for_status()
+                self._csrf_token = response.json().get('csrf_token') or ''
+            except Exception as e:
+                self.logger.warning(f"获取CSRF令牌失败，将不带令牌请求API: {e}")
+                self._csrf_token = ''
+        return self._csrf_token
+
+    def api_query(self, operation_name, query, variables, max_retries=3):
+        """发送GraphQL查询，返回解码后的JSON，失败时返回None"""
+        headers = {
+            'Content-Type': 'application/json',
+            'Accept': 'application/json',
+            'X-Csrf-Token': self.get_csrf_token(),
+        }
+        payload = {'operationName': operation_name, 'query': query, 'variables': variables}
+        retries = 0
+        while retries < max_retries:
+            try:
+                session, _ = self.get_http_session()
+                self.rate_limiter.acquire(self.graphql_url)
+                start_time = time.time()
+                response = session.post(self.graphql_url, json=payload, headers=headers, timeout=60)
+                self.rate_limiter.record(self.graphql_url, status=response.status_code, elapsed=time.time() - start_time,
+                                         retry_after=parse_retry_after(response.headers.get('Retry-After')))
+                response.raise_for_status()
+                data = response.json()
+                if data.get('errors'):
+                    self.logger.warning(f"GraphQL查询 {operation_name} 返回错误: {data['errors']}")
+                return data
+            except Exception as e:
+                retries += 1
+                self.logger.error(f"GraphQL请求出错 (第 {retries}/{max_retries} 次尝试): {operation_name}, 错误: {e}")
+                if retries < max_retries:
+                    wait_time = random.uniform(2, 5) * retries  # 指数退避
+                    self.logger.info(f"{wait_time:.2f}秒后重试...")
+                    time.sleep(wait_time)
+        self.logger.error(f"达到最大重试次数，GraphQL请求失败: {operation_name}")
+        return None
+
+    def api_get_all_programs(self, on_links=None, backpressure=None):
+        """通过GraphQL分页获取所有众测项目链接，每页请求api_page_size条
+
+        on_links在每页新项目链接到达时立即被调用，backpressure在每页处理完后调用，可阻塞以暂停获取
+        """
+        all_program_links, page, listing_complete = self.resume_listing()
+        if on_links and all_program_links:
+            on_links(list(all_program_links))
+        if listing_complete:
+            return all_program_links
+        # 列表中的重复项目会被去重，从检查点恢复时使用记录的原始偏移量，而不是已有链接数
+        offset = self.checkpoint.next_offset
+        if offset is None:
+            offset = len(all_program_links)
+        seen = set(all_program_links)
+        page_fingerprints = {}
+        while True:
+            self.logger.info(f"正在通过API获取第 {offset + 1} 条起的众测项目")
+            data = self.api_query('DiscoveryQuery', OPPORTUNITIES_QUERY, {
+                'query': {},
+                'filter': {'bool': {'filter': [{'bool': {'must_not': {'term': {'team_type': 'Engagements::Assessment'}}}}]}},
+                'from': offset,
+                'size': self.api_page_size,
+                'sort': [{'field': 'launched_at', 'direction': 'DESC'}],
+                'post_filters': {'my_programs': False, 'bookmarked': False, 'campaign_teams': False},
+            })
+            if not data:
+                self.logger.warning("无法获取项目列表数据，停止爬取")
+                break
+
+            programs, total_count = programs_from_api(data)
+            if not programs:
+                self.logger.info("没有找到更多众测项目，停止爬取")
+                self.checkpoint.record_listing_complete()
+                break
+
+            page_links = []
+            for handle, updated_at in programs:
+                program_url = f'{self.base_url}/{handle}'
+                page_links.append(program_url)
+                if updated_at:
+                    self.program_updated_at[program_url] = updated_at
+            if self.is_repeated_listing_page(page, page_links, page_fingerprints):
+                self.checkpoint.record_listing_complete()
+                break
+            program_links = []
+            self.collect_listing_links(page_links, seen, program_links, on_links)
+            if not program_links:
+                self.logger.info("该页没有新的众测项目，停止爬取")
+                self.checkpoint.record_listing_complete()
+                break
+            all_program_links.extend(program_links)
+            offset += len(programs)
+            self.checkpoint_listing_page(page, program_links, offset)
+            page += 1
+            if total_count is not None and offset >= total_count:
+                self.checkpoint.record_listing_complete()
+                break
+            if backpressure:
+                backpressure()
+
+        self.logger.info(f"总共找到 {len(all_program_links)} 个众测项目链接")
+        return all_program_links
+
+    def api_crawl_program(self, program_url):
+        """通过GraphQL分页获取项目的范围资产，提取可提交的域名"""
+        handle = program_url.rstrip('/').rsplit('/', 1)[-1]
+        domain_list = []
+        offset = 0
+        complete = False  # 所有分页都获取成功时才记录指纹
+        while True:
+            data = self.api_query('PolicySearchStructuredScopesQuery', STRUCTURED_SCOPES_QUERY, {
+                'handle': handle,
+                'searchString': '',
+                'eligibleForSubmission': True,
+                'from': offset,
+                'size': self.api_page_size,
+            })
+            if not data:
+                break
+            domains, node_count, total_count = scope_from_api(data)
+            domain_list.extend(domains)
+            offset += node_count
+            if node_count == 0 or total_count is None or offset >= total_count:
+                complete = True
+                break
+
+        if not complete:
+            # 部分分页获取失败时不记录域名，项目按失败处理，避免不完整的范围覆盖上次的结果
+            return None
+        self.fingerprints.put(program_url, domains_fingerprint(domain_list), domain_list,
+                              self.program_updated_at.get(program_url))
+        self._record_domains(domain_list, program_url)
+        return domain_list
+
+    def send_request(self, url, max_retries=3, listing=None):
+        """发送请求，支持MCP Playwright、Playwright、Selenium和Firecrawl三种模式
+
+        listing为列表页获取的状态：滚动加载中新出现的项目链接交给它的回调，列表获取停止后不再请求
+        """
         # 优先使用MCP Playwright
         if self.use_mcp_playwright and hasattr(self, 'mcp_playwright') and self.mcp_playwright:
                 content = self.mcp_playwright_get(url, max_retries)
@@ -554,9 +1166,9 @@ class HackerOneScraper:
                 self.logger.warning("MCP Playwright请求失败，尝试其他模式")
             
         # 其次使用Playwright
-        if self.use_playwright and hasattr(self, 'page') and self.page:
-                content = self.playwright_get(url, max_retries)
-                if content:
+        if self.use_playwright and ((hasattr(self, 'page') and self.page) or self.page_pool):
+                content = self.playwright_get(url, max_retries, listing)
+                if content or (listing and listing.stopped):
                     return content
                 self.logger.warning("Playwright请求失败，尝试其他模式")
         
@@ -582,199 +1194,22 @@ class HackerOneScraper:
             except Exception as e:
                 self.logger.error(f"MCP Firecrawl请求失败: {e}")
             
-        # 其次检查是否使用Firecrawl
+        # 其次检查是否使用Firecrawl（基本HTTP请求），没有WebDriver时也作为回退
+        if self.use_firecrawl or not ((hasattr(self, 'driver') and self.driver) or self.driver_pool):
             if self.use_firecrawl:
                 self.logger.info(f"使用Firecrawl获取: {url}")
-                # 简单的Firecrawl模式替代实现
-                # 注意：完整的Firecrawl功能需要API密钥
-                # 这里只是提供一个临时替代方案
-            try:
-                import requests
-                headers = {
-                    'User-Agent': random.choice(USER_AGENTS),
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
-                    'Accept-Language': 'en-US,en;q=0.5',
-                    'Referer': self.base_url,
-                    'DNT': '1',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1'
-                }
-                
-                # 如果有Cookie，添加到请求头
-                cookies_dict = {}
-                if hasattr(self, 'cookies') and self.cookies:
-                    for cookie in self.cookies:
-                        cookies_dict[cookie['name']] = cookie['value']
-                    self.logger.info("Firecrawl模式使用登录Cookie")
-                
-                # 如果有代理，使用代理发送请求
-                proxies = None
-                if self.use_proxy and self.proxy_list:
-                    proxy = self.get_random_proxy()
-                    if proxy:
-                        proxies = proxy
-                        self.logger.info(f"Firecrawl模式使用代理: {proxy}")
-                
-                # 发送请求，增加超时时间到60秒
-                response = requests.get(url, headers=headers, cookies=cookies_dict, proxies=proxies, timeout=60)
-                response.raise_for_status()
-                
-                self.logger.info(f"Firecrawl模式获取页面成功: {url}")
-                
-                # 保存页面内容用于调试
-                if 'bug-bounty-programs' in url or 'opportunities/all' in url:
-                    debug_file = 'hackerone_page.html'
-                    with open(debug_file, 'w', encoding='utf-8') as f:
-                        f.write(response.text)
-                    self.logger.info(f"页面内容已保存到 {debug_file}")
-                    
-                    # 提示用户这个模式的局限性
-                    self.logger.warning("注意：HackerOne是一个需要JavaScript的单页应用，Firecrawl模式（简单HTTP请求）可能无法获取完整内容")
-                    self.logger.warning("建议：使用ChromeDriver或Playwright模式来确保能够执行JavaScript并获取完整的众测项目列表")
-                
-                # 添加随机延迟
-                    delay = random.uniform(*self.request_delay)
-                    self.logger.info(f"添加随机延迟: {delay:.2f}秒")
-                    time.sleep(delay)
-                
-                return response.text
-            except requests.exceptions.Timeout:
-                self.logger.error(f"Firecrawl模式请求超时: {url}")
-                self.logger.error("可能是网络连接问题或HackerOne网站限制。请检查您的网络连接。")
-                # 尝试增加重试次数，这次使用不同的代理
-                self.logger.info("尝试再次发送请求，使用不同的代理...")
-                try:
-                    # 使用不同的代理
-                    retry_proxies = None
-                    if self.use_proxy and self.proxy_list:
-                        retry_proxy = self.get_random_proxy()
-                        if retry_proxy:
-                            retry_proxies = retry_proxy
-                            self.logger.info(f"Firecrawl模式重试使用代理: {retry_proxy}")
-                    
-                    response = requests.get(url, headers=headers, cookies=cookies_dict, proxies=retry_proxies, timeout=90)
-                    response.raise_for_status()
-                    self.logger.info(f"重试成功: {url}")
-                    return response.text
-                except Exception as retry_e:
-                    self.logger.error(f"重试也失败了: {retry_e}")
-                    return None
-            except requests.exceptions.ConnectionError:
-                self.logger.error(f"Firecrawl模式连接错误: {url}")
-                self.logger.error("可能是网络连接问题或代理配置错误。")
-                return None
-            except Exception as e:
-                self.logger.error(f"Firecrawl模式请求失败: {e}")
-                # 如果有Firecrawl API密钥，提示正确的使用方法
-                if hasattr(self, 'firecrawl_api_key') and self.firecrawl_api_key:
-                    self.logger.error("提示: 如需使用完整的Firecrawl功能，请配置API密钥并使用官方API。")
-                return None
-        
+            return self.http_get(url)
+
         # 最后使用Selenium
+        if self.driver_pool:
+            return self.pooled_selenium_get(url, max_retries, listing)
         if hasattr(self, 'driver') and self.driver:
             retries = 0
             while retries < max_retries:
                 try:
-                    self.logger.info(f"使用Selenium访问: {url}")
-                    # 记录页面加载开始时间
-                    start_time = time.time()
-                    self.driver.get(url)
-                    # 等待页面加载完成
-                    self.logger.info(f"等待页面加载完成: {url}")
-                    # 等待body元素出现
-                    WebDriverWait(self.driver, 30).until(
-                        EC.presence_of_element_located((By.TAG_NAME, 'body'))
-                    )
-                    self.logger.info(f"body元素已加载: {url}")
-                    
-                    # 尝试等待特定元素出现（对于众测项目页面）
-                    if 'bug-bounty-programs' in url or 'opportunities/all' in url:
-                        try:
-                            # 等待项目卡片元素出现 (适配SPA)
-                            try:
-                                # 等待应用根容器加载
-                                WebDriverWait(self.driver, 30).until(
-                                    EC.presence_of_element_located((By.CLASS_NAME, 'js-application-root'))
-                                )
-                                self.logger.info(f"应用根容器已加载: {url}")
-                                
-                                # 执行JavaScript以触发内容加载
-                                self.logger.info("执行JavaScript以触发内容加载...")
-                                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                                
-                                # 等待网络请求完成
-                                self.logger.info("等待网络请求完成...")
-                                WebDriverWait(self.driver, 30).until(
-                                    lambda d: d.execute_script('return window.performance.getEntriesByType("resource").filter(e => e.initiatorType === "xmlhttprequest" || e.initiatorType === "fetch").length > 0')
-                                )
-                                
-                                # 等待动态内容加载
-                                WebDriverWait(self.driver, 60).until(
-                                    lambda d: d.execute_script('return document.querySelector(\'.js-application-root\').children.length > 0')
-                                )
-                                self.logger.info(f"动态内容已加载: {url}")
-                                
-                                # 再次滚动页面以确保所有内容加载
-                                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                                time.sleep(5)
-                                
-                                # 尝试使用更通用的选择器
-                                selectors = [
-                                    (By.CSS_SELECTOR, '.js-application-root div'),
-                                    (By.CSS_SELECTOR, '[data-testid="program-card"]'),
-                                    (By.CSS_SELECTOR, '.application-card'),
-                                    (By.CSS_SELECTOR, '.program-card'),
-                                    (By.CLASS_NAME, 'sc-18f276c0-0')
-                                ]
-                                
-                                for by, selector in selectors:
-                                    try:
-                                        elements = self.driver.find_elements(by, selector)
-                                        if len(elements) > 0:
-                                            self.logger.info(f"使用选择器 {by}:{selector} 找到 {len(elements)} 个元素: {url}")
-                                            break
-                                    except:
-                                        continue
-                                else:
-                                    self.logger.warning(f"所有选择器都未能找到元素: {url}")
-                            except Exception as e:
-                                self.logger.warning(f"等待页面内容加载超时: {e}")
-                        except Exception as e:
-                            self.logger.warning(f"等待项目卡片元素超时: {e}")
-                            # 尝试等待另一种可能的项目卡片类名
-                            try:
-                                WebDriverWait(self.driver, 15).until(
-                                    EC.presence_of_element_located((By.CLASS_NAME, 'program-card'))
-                                )
-                                self.logger.info(f"备选项目卡片元素已加载: {url}")
-                            except Exception as e2:
-                                self.logger.warning(f"等待备选项目卡片元素也超时: {e2}")
-
-                    # 等待额外时间确保内容加载完成
-                    wait_time = random.uniform(3, 8)
-                    self.logger.info(f"等待{wait_time:.2f}秒确保内容加载完成")
-                    time.sleep(wait_time)
-                    
-                    # 记录页面加载完成时间
-                    load_time = time.time() - start_time
-                    self.logger.info(f"页面加载完成，耗时: {load_time:.2f}秒: {url}")
-                    
-                    # 保存页面内容用于调试
-                    if 'bug-bounty-programs' in url or 'opportunities/all' in url:
-                        debug_file = 'hackerone_page.html'
-                        with open(debug_file, 'w', encoding='utf-8') as f:
-                            f.write(self.driver.page_source)
-                    self.logger.info(f"页面内容已保存到 {debug_file}")
-                    # 检查保存的文件大小
-                    file_size = os.path.getsize(debug_file) / 1024
-                    self.logger.info(f"保存的页面大小: {file_size:.2f} KB")
-                    
-                    # 添加随机延迟
-                    delay = random.uniform(*self.request_delay)
-                    self.logger.info(f"添加随机延迟: {delay:.2f}秒")
-                    time.sleep(delay)
-                    
-                    return self.driver.page_source
+                    return self.selenium_load(self.driver, url, listing)
+                except ListingAborted:
+                    return None
                 except WebDriverException as e:
                     retries += 1
                     self.logger.error(f"WebDriver异常 (第 {retries}/{max_retries} 次尝试): {url}, 错误: {e}")
@@ -801,6 +1236,220 @@ class HackerOneScraper:
         self.logger.error("没有可用的请求模式。请确保至少启用了Playwright、Selenium或Firecrawl中的一种。")
         return None
 
+    def fetch_page(self, url, max_retries=3, listing=None):
+        """线程安全地获取页面内容，共享的浏览器实例会被串行访问"""
+        if self._fetch_is_thread_safe():
+            return self.send_request(url, max_retries, listing)
+        with self.fetch_lock:
+            return self.send_request(url, max_retries, listing)
+
+    def release_sync_playwright(self):
+        """释放同步Playwright，使其登录状态可以交给异步后端使用"""
+        if not self.page:
+            return
+        # 同步API不能在运行中的事件循环里调用，必须在进入asyncio之前导出登录状态
+        if self.context and not self.storage_state:
+            try:
+                self.storage_state = self.context.storage_state()
+            except Exception as e:
+                self.logger.warning(f"导出Playwright登录状态失败: {e}")
+        self.close_playwright()
+        self.page = None
+        self.context = None
+        self.browser = None
+        self.playwright = None
+
+    def start_page_pool(self, size=None):
+        """在后台事件循环中启动Playwright页面池，供多个工作线程并行渲染"""
+        size = size or self.playwright_pages
+        # 导出登录状态后关闭同步浏览器，所有渲染都在页面池的Chromium实例中进行
+        self.release_sync_playwright()
+        self._pool_loop = AsyncLoopThread()
+        self.page_pool = PlaywrightPagePool(size=size, storage_state=self.storage_state, logger=self.logger,
+                                            lean_profile=self.lean_profile)
+        try:
+            self._pool_loop.run(self.page_pool.start())
+        except Exception:
+            self.close_page_pool()
+            raise
+
+    def close_page_pool(self):
+        """关闭后台事件循环中的Playwright页面池"""
+        if not self._pool_loop:
+            return
+        try:
+            if self.page_pool:
+                self._pool_loop.run(self.page_pool.close())
+        except Exception as e:
+            self.logger.error(f"关闭Playwright页面池时出错: {e}")
+        finally:
+            self._pool_loop.stop()
+            self._pool_loop = None
+            self.page_pool = None
+
+    async def start_async_backends(self, concurrency=None):
+        """初始化异步后端：aiohttp会话和异步Playwright浏览器"""
+        concurrency = concurrency or self.concurrency
+
+        if aiohttp_available and not self._aiohttp_session:
+            cookies_dict = {}
+            if self.cookies:
+                for cookie in self.cookies:
+                    cookies_dict[cookie['name']] = cookie['value']
+            connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=concurrency)
+            self._aiohttp_session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=60),
+                cookies=cookies_dict
+            )
+            self.logger.info(f"aiohttp会话已创建，连接池上限: {concurrency}")
+        elif not aiohttp_available:
+            self.logger.warning("未安装aiohttp，异步模式下的HTTP请求将回退到线程池。请运行 'pip install aiohttp' 安装")
+
+        if self.use_playwright and playwright_available and not self.page_pool:
+            self.page_pool = PlaywrightPagePool(
+                size=min(concurrency, self.playwright_pages or ASYNC_BROWSER_PAGES),
+                storage_state=self.storage_state,
+                logger=self.logger,
+                lean_profile=self.lean_profile
+            )
+            await self.page_pool.start()
+
+    async def close_async_backends(self):
+        """关闭异步后端资源"""
+        try:
+            if self._aiohttp_session:
+                await self._aiohttp_session.close()
+            # 后台事件循环中的页面池由close_page_pool负责关闭
+            if self.page_pool and not self._pool_loop:
+                await self.page_pool.close()
+                self.page_pool = None
+            self.logger.info("异步后端资源已释放")
+        except Exception as e:
+            self.logger.error(f"关闭异步后端资源时出错: {e}")
+        finally:
+            self._aiohttp_session = None
+
+    async def async_playwright_get(self, url, max_retries=3, listing=None):
+        """从页面池借出一个页面渲染URL，渲染完成后归还"""
+        retries = 0
+        while retries < max_retries:
+            capture = None
+            try:
+                async with self.page_pool.page() as page:
+                    self.logger.info(f"使用Playwright页面池访问: {url}")
+                    await self.rate_limiter.acquire_async(url)
+                    start_time = time.time()
+                    capture = PlaywrightCapture(page).start() if self.capture_json else None
+                    try:
+                        response = await page.goto(url, wait_until=self.page_wait_until)
+                    except Exception:
+                        if capture:
+                            capture.stop()
+                        raise
+                    self.rate_limiter.record(url, status=response.status if response else None,
+                                             elapsed=time.time() - start_time)
+
+                    # 等待页面渲染完成，如果是列表页，滚动到不再出现新的项目卡片为止
+                    selectors = ready_selectors(url)
+                    try:
+                        self.log_readiness(url, await wait_ready_playwright_async(
+                            page, selectors, self.ready_quiet_ms, self.ready_timeout))
+                        if is_listing_url(url):
+                            await self.scroll_listing_async(page.evaluate, lambda: wait_ready_playwright_async(
+                                page, selectors, self.ready_quiet_ms, self.ready_timeout), listing)
+                    except ListingAborted:
+                        raise
+                    except Exception as e:
+                        self.logger.warning(f"等待页面就绪出错，直接使用当前页面内容: {e}")
+
+                    # 捕获到项目列表或范围数据时直接返回，否则序列化页面DOM
+                    content = self.captured_page(url, await capture.payloads_async()) if capture else None
+                    if content is None and self.extract_in_page:
+                        content = await self.extracted_page_async(url, page.evaluate)
+                    if content is None:
+                        content = await page.content()
+
+                return content
+            except ListingAborted:
+                if capture:
+                    capture.stop()
+                return None
+            except Exception as e:
+                self.rate_limiter.record(url, error=True)
+                retries += 1
+                self.logger.error(f"异步Playwright请求出错 (第 {retries}/{max_retries} 次尝试): {url}, 错误: {e}")
+                if retries >= max_retries:
+                    self.logger.error(f"达到最大重试次数，请求失败: {url}")
+                    return None
+                await asyncio.sleep(random.uniform(2, 5) * retries)  # 指数退避
+
+        return None
+
+    async def aiohttp_get(self, url, max_retries=3):
+        """使用aiohttp异步获取页面内容"""
+        retries = 0
+        while retries < max_retries:
+            try:
+                # aiohttp每个请求只接受一个代理地址
+                proxy = None
+                if self.use_proxy and self.proxy_list:
+                    random_proxy = self.get_random_proxy()
+                    if random_proxy:
+                        proxy = random_proxy.get('http')
+
+                cache = self.response_cache
+                entry, body = cache.lookup(url) if cache else (None, None)
+                if cache and not is_listing_url(url) and cache.is_fresh(entry):
+                    cache.touch(url)
+                    self.logger.debug(f"缓存命中: {url}")
+                    return body
+
+                self.logger.info(f"使用aiohttp访问: {url}")
+                headers = self.get_random_headers()
+                if cache:
+                    headers.update(cache.conditional_headers(entry))
+                await self.rate_limiter.acquire_async(url)
+                start_time = time.time()
+                async with self._aiohttp_session.get(url, headers=headers, proxy=proxy) as response:
+                    self.rate_limiter.record(url, status=response.status, elapsed=time.time() - start_time,
+                                             retry_after=parse_retry_after(response.headers.get('Retry-After')))
+                    if response.status == 304 and body is not None:
+                        cache.touch(url, mark_fetched=True)
+                        return body
+                    response.raise_for_status()
+                    content = await response.text()
+                    if cache:
+                        cache.store(url, content, response.headers)
+
+                return content
+            except Exception as e:
+                self.rate_limiter.record(url, error=True)
+                retries += 1
+                self.logger.error(f"aiohttp请求出错 (第 {retries}/{max_retries} 次尝试): {url}, 错误: {e}")
+                if retries >= max_retries:
+                    self.logger.error(f"达到最大重试次数，请求失败: {url}")
+                    return None
+                await asyncio.sleep(random.uniform(2, 5) * retries)  # 指数退避
+
+        return None
+
+    async def async_send_request(self, url, max_retries=3, listing=None):
+        """异步发送请求，支持异步Playwright和aiohttp，其他模式回退到线程池"""
+        if self.page_pool and not self._pool_loop:
+            content = await self.async_playwright_get(url, max_retries, listing)
+            if content or (listing and listing.stopped):
+                return content
+            self.logger.warning("异步Playwright请求失败，尝试其他模式")
+
+        # MCP和Selenium模式没有异步实现，HTTP请求优先使用aiohttp
+        if (self._aiohttp_session and not self.use_mcp_playwright
+                and not (hasattr(self, 'driver') and self.driver) and not self.driver_pool):
+            return await self.aiohttp_get(url, max_retries)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.fetch_page, url, max_retries, listing)
+
     def __del__(self):
         """析构函数，关闭浏览器"""
         if hasattr(self, 'driver'):
@@ -809,12 +1458,29 @@ class HackerOneScraper:
                 self.logger.info("浏览器已关闭")
             except:
                 pass
+        if hasattr(self, 'driver_pool') and self.driver_pool:
+            try:
+                self.driver_pool.close()
+            except:
+                pass
+        if hasattr(self, 'session_pool'):
+            self.session_pool.close()
+        if getattr(self, 'store', None):
+            try:
+                self.store.close()
+            except:
+                pass
+        if getattr(self, 'response_cache', None):
+            try:
+                self.response_cache.close()
+            except:
+                pass
 
     def validate_proxy(self, proxy):
         """验证代理是否有效"""
         try:
             test_url = 'https://www.hackerone.com'
-            response = requests.get(test_url, proxies=proxy, timeout=10)
+            response = self.session_pool.get(proxy).get(test_url, timeout=10)
             return response.status_code == 200
         except:
             return False
@@ -843,57 +1509,29 @@ class HackerOneScraper:
         if not html:
             return []
 
-        soup = BeautifulSoup(html, 'html.parser')
-        
         # 首先检查页面是否需要JavaScript
         if 'js-disabled' in html and 'It looks like your JavaScript is disabled' in html:
             self.logger.warning("检测到页面需要JavaScript才能正常显示内容")
             self.logger.warning("当前模式可能无法获取完整的众测项目列表")
             self.logger.warning("建议：请使用ChromeDriver模式来确保能够执行JavaScript")
             
-        # 方法1: 尝试从script标签中提取JSON数据
-        script_tags = soup.find_all('script', type='application/json')
-        for script in script_tags:
-            try:
-                json_data = json.loads(script.string)
-                # 尝试从JSON数据中提取项目信息
-                if 'props' in json_data and 'pageProps' in json_data['props']:
-                    page_props = json_data['props']['pageProps']
-                    if 'programs' in page_props:
-                        programs = page_props['programs']
-                        self.logger.info(f"从JSON数据中找到 {len(programs)} 个众测项目")
-                        program_links = []
-                        for program in programs:
-                            if 'url' in program:
-                                program_links.append(program['url'])
-                            elif 'slug' in program:
-                                program_links.append(f"https://hackerone.com/{program['slug']}")
-                        return program_links
-                # 尝试其他可能的JSON结构
-                if 'programs' in json_data:
-                        programs = json_data['programs']
-                        self.logger.info(f"从JSON数据中找到 {len(programs)} 个众测项目")
-                        program_links = []
-                        for program in programs:
-                            if 'url' in program:
-                                program_links.append(program['url'])
-                            elif 'slug' in program:
-                                program_links.append(f"https://hackerone.com/{program['slug']}")
-                        return program_links
-            except:
-                continue
-
-        # 方法2: 尝试提取所有链接并筛选
-        all_links = soup.find_all('a', href=True)
-        program_links = []
-        for link in all_links:
-            href = link['href']
-            # 众测项目链接通常包含组织名称，如 /company-name
-            if href.startswith('/') and len(href) > 1 and '?' not in href and '#' not in href:
-                # 排除导航链接
-                if href not in ['/login', '/signup', '/programs', '/about', '/blog', '/contact']:
-                    full_url = urljoin(self.base_url, href)
-                    program_links.append(full_url)
+        # 方法1: 快速路径，不构建DOM，直接使用浏览器捕获的JSON响应或原始HTML中script标签内的JSON数据
+        if isinstance(html, CapturedPage):
+            listing = listing_from_payloads(html.payloads, self.base_url)
+        else:
+            listing = fast_program_listing(html)
+        if listing is not None:
+            self.logger.info(f"从JSON数据中找到 {len(listing)} 个众测项目")
+            program_links = []
+            for program_url, updated_at in listing:
+                program_links.append(program_url)
+                if updated_at:
+                    self.program_updated_at[program_url] = updated_at
+            return program_links
+
+        # 方法2: 尝试提取所有链接并筛选，页面内提取的结果中已经带有链接
+        hrefs = html.hrefs if isinstance(html, ExtractedPage) else parse_html(html, self.parser_engine).hrefs()
+        program_links = self.program_links_from_hrefs(hrefs)
 
         if program_links:
             self.logger.info(f"通过链接筛选找到 {len(program_links)} 个可能的众测项目")
@@ -902,182 +1540,841 @@ class HackerOneScraper:
 
         return program_links
 
+    def program_links_from_hrefs(self, hrefs):
+        """从链接中筛选可能的众测项目链接"""
+        program_links = []
+        for href in hrefs:
+            # 众测项目链接通常包含组织名称，如 /company-name
+            if href and href.startswith('/') and len(href) > 1 and '?' not in href and '#' not in href:
+                # 排除导航链接
+                if href not in ['/login', '/signup', '/programs', '/about', '/blog', '/contact']:
+                    program_links.append(urljoin(self.base_url, href))
+        return program_links
+
+    def _record_domains(self, domains, program_url):
+        """一次加锁记录一个项目的所有域名，新增或变化的记录等待下次保存进度时追加到日志
+
+        使用数据库存储时域名只写入数据库，内存占用不随结果总数增长
+        """
+        if self.store:
+            self.store.record_domains(program_url, domains, self.program_updated_at.get(program_url))
+            return
+        with self.result_lock:
+            for domain in domains:
+                self.domains.add(domain)
+                if self.domain_url_map.get(domain) != program_url:
+                    self.domain_url_map[domain] = program_url
+                    self._pending_records.append((domain, program_url))
+
+    def domain_count(self):
+        """当前结果中的唯一域名数，使用数据库存储时从数据库中统计"""
+        if self.store:
+            return self.store.count_domains()
+        return len(self.domains)
+
     def parse_program_details(self, html, program_url):
         """解析项目详情页面，提取域名和对应的URL"""
         if not html:
             return []
 
-        soup = BeautifulSoup(html, 'html.parser')
-        domain_list = []
-        
         # 首先检查页面是否需要JavaScript
         if 'js-disabled' in html and 'It looks like your JavaScript is disabled' in html:
             self.logger.warning("检测到页面需要JavaScript才能正常显示内容")
             self.logger.warning("当前模式可能无法获取完整的域名信息")
             self.logger.warning("建议：请使用ChromeDriver模式来确保能够执行JavaScript")
 
-        # 尝试找到域名部分 - 方法1
-        target_domains_section = soup.find('div', {'data-qa': 'target-domains'})
-        if target_domains_section:
-            domain_elements = target_domains_section.find_all('code')
-            for domain in domain_elements:
-                domain_text = domain.get_text(strip=True)
-                if domain_text:
-                    domain_list.append(domain_text)
-                    self.domains.add(domain_text)
-                    self.domain_url_map[domain_text] = program_url
-
-        # 尝试找到域名部分 - 方法2 (备用选择器)
-        if not domain_list:
-            target_domains_section = soup.find('div', class_='program-scope__target-domains')
-            if target_domains_section:
-                domain_elements = target_domains_section.find_all('code')
-                for domain in domain_elements:
-                    domain_text = domain.get_text(strip=True)
-                    if domain_text:
-                        domain_list.append(domain_text)
-                        self.domains.add(domain_text)
-                        self.domain_url_map[domain_text] = program_url
-
-        # 尝试找到域名部分 - 方法3 (直接搜索所有code标签)
-        if not domain_list:
-            all_code_tags = soup.find_all('code')
-            for code in all_code_tags:
-                code_text = code.get_text(strip=True)
-                # 简单判断是否为域名
-                if '.' in code_text and len(code_text) > 3 and not code_text.startswith('<') and not code_text.endswith('>'):
-                    domain_list.append(code_text)
-                    self.domains.add(domain_text)
-                    self.domain_url_map[code_text] = program_url
-        
-        # 尝试找到域名部分 - 方法4 (从script标签中提取JSON数据)
-        if not domain_list:
-            script_tags = soup.find_all('script', type='application/json')
-            for script in script_tags:
-                try:
-                    json_data = json.loads(script.string)
-                    # 尝试从JSON数据中提取域名信息
-                    if 'props' in json_data and 'pageProps' in json_data['props']:
-                        page_props = json_data['props']['pageProps']
-                        if 'program' in page_props and 'targets' in page_props['program']:
-                            targets = page_props['program']['targets']
-                            if 'in_scope' in targets:
-                                for target in targets['in_scope']:
-                                    if 'asset_identifier' in target:
-                                        domain = target['asset_identifier']
-                                        if '.' in domain:
-                                            domain_list.append(domain)
-                                            self.domains.add(domain)
-                                            self.domain_url_map[domain] = program_url
-                except:
-                    continue
+        # 浏览器捕获的JSON响应中直接带有范围数据
+        captured = scope_from_payloads(html.payloads) if isinstance(html, CapturedPage) else None
+
+        # 增量爬取：内嵌范围数据的指纹与上次相同时直接复用上次的域名，不再解析
+        fingerprint = captured[1] if captured else fast_scope_fingerprint(html)
+        stored = self.fingerprints.get(program_url) if fingerprint and not self.full_recrawl else None
+        reused = self.stored_domains(program_url, stored) if stored and stored['fingerprint'] == fingerprint else None
+        if reused is not None:
+            self.logger.debug(f"项目范围未变化，复用上次的 {len(reused)} 个域名: {program_url}")
+            with self.result_lock:
+                self.unchanged_count += 1
+            domain_list = reused
+        elif captured:
+            domain_list = captured[0]
+        elif isinstance(html, ExtractedPage):
+            # 页面内提取的结果中已经带有各个候选来源
+            domain_list = resolve_scope(html.candidates, use_json=False)
+        else:
+            # 快速路径：页面内嵌的JSON数据中有in_scope目标时直接使用，无需构建DOM
+            domain_list = fast_scope_domains(html)
+            if not domain_list:
+                # 一次遍历收集所有候选来源，再按原有优先级确定域名：
+                # data-qa='target-domains' > program-scope__target-domains类 > 所有code标签
+                doc = parse_html(html, self.parser_engine)
+                domain_list = resolve_scope(doc.scope_candidates(), use_json=False)
+        # 页面没有内嵌范围数据时，以提取出的域名列表作为指纹；范围未变化时也要更新记录中的更新时间
+        self.fingerprints.put(program_url, fingerprint or domains_fingerprint(domain_list), domain_list,
+                              self.program_updated_at.get(program_url))
+        self._record_domains(domain_list, program_url)
 
         return domain_list
 
-    def get_all_programs(self):
-        """获取所有众测项目链接"""
-        all_program_links = []
-        current_page = 1
+    def listing_window_size(self):
+        """列表页预取窗口大小，请求不能在多个线程中同时进行时为1"""
+        if self.listing_window <= 1 or not self._fetch_is_thread_safe():
+            return 1
+        if self.use_playwright and self.page and not self.page_pool:
+            # 同步Playwright的页面只能在创建它的线程中使用
+            return 1
+        return self.listing_window
+
+    def fetch_listing_page(self, page, listing=None):
+        """获取一个列表页，listing接收滚动加载期间新出现的项目链接，列表获取已停止时返回None"""
+        if listing and listing.stopped:
+            return None
+        self.logger.info(f"正在获取第 {page} 页的众测项目")
+        return self.send_request(f'{self.programs_url}?page={page}', listing=listing)
 
-        while True:
-            self.logger.info(f"正在获取第 {current_page} 页的众测项目")
-            page_url = f'{self.programs_url}?page={current_page}'
-            html = self.send_request(page_url)
+    async def fetch_listing_page_async(self, page, listing=None):
+        """fetch_listing_page的异步版本"""
+        if listing and listing.stopped:
+            return None
+        self.logger.info(f"正在获取第 {page} 页的众测项目")
+        return await self.async_send_request(f'{self.programs_url}?page={page}', listing=listing)
 
-            if not html:
-                self.logger.warning("无法获取页面内容，停止爬取")
-                break
+    def is_repeated_listing_page(self, page, program_links, page_fingerprints):
+        """按项目链接集合计算列表页指纹，与之前某页完全相同时返回True（网站忽略了翻页参数）"""
+        if not program_links:
+            return False
+        fingerprint = link_set_fingerprint(program_links)
+        first_page = page_fingerprints.setdefault(fingerprint, page)
+        if first_page != page:
+            self.logger.warning(f"第 {page} 页的项目链接与第 {first_page} 页完全相同，网站可能忽略了翻页参数，停止爬取")
+            return True
+        return False
 
-            program_links = self.parse_programs_page(html)
-            if not program_links:
-                self.logger.info("没有找到更多众测项目，停止爬取")
-                break
+    def process_listing_page(self, page, html, seen, page_links, on_links=None, page_fingerprints=None):
+        """解析一个列表页并记录到检查点，返回是否继续获取下一页
 
-            all_program_links.extend(program_links)
-            current_page += 1
+        page_fingerprints记录已处理页面的链接集合指纹，出现重复页面或没有新链接时停止翻页
+        """
+        if not html:
+            self.logger.warning("无法获取页面内容，停止爬取")
+            return False
+
+        program_links = self.parse_programs_page(html)
+        if page_fingerprints is not None and self.is_repeated_listing_page(
+                page, set(program_links) | set(page_links), page_fingerprints):
+            self.checkpoint.record_listing_complete()
+            return False
+
+        self.collect_listing_links(program_links, seen, page_links, on_links)
+        if not page_links:
+            # 没有项目或只有之前页面出现过的项目（无限滚动列表不支持翻页时会重复第一页）
+            self.logger.info("该页没有新的众测项目，停止爬取")
+            self.checkpoint.record_listing_complete()
+            return False
+
+        self.checkpoint_listing_page(page, page_links)
+        return True
+
+    def listing_page_count(self, html, page_size, page):
+        """从列表页数据中读取总页数，只有项目总数时按本页的项目数推算，都没有时返回None"""
+        if isinstance(html, CapturedPage):
+            total, pages = listing_totals(html.payloads)
+        else:
+            total, pages = fast_listing_totals(html)
+        if pages is None and total is not None and page_size:
+            # 只有第一页的项目数能代表每页的大小
+            pages = -(-total // page_size) if page == 1 else None
+        if pages:
+            self.logger.info(f"列表共 {pages} 页，将在预取窗口内获取到最后一页为止")
+        return pages
+
+    def collect_listing_links(self, program_links, seen, page_links, on_links=None):
+        """将列表页中新出现的项目链接去重后加入page_links，并交给on_links回调"""
+        new_links = [url for url in dict.fromkeys(program_links) if url not in seen]
+        if not new_links:
+            return
+        seen.update(new_links)
+        page_links.extend(new_links)
+        if on_links:
+            on_links(new_links)
+
+    def get_all_programs(self, on_links=None, backpressure=None):
+        """获取所有众测项目链接，on_links在每批新项目链接出现时立即被调用，backpressure在每个列表页处理完后调用，可阻塞以暂停获取"""
+        if self.use_api:
+            return self.api_get_all_programs(on_links, backpressure)
+
+        all_program_links, current_page, listing_complete = self.resume_listing()
+        if on_links and all_program_links:
+            on_links(list(all_program_links))
+        if listing_complete:
+            return all_program_links
+
+        seen = set(all_program_links)
+        # 预取的页面在各自的线程中滚动加载，新出现的链接在锁内去重后加入所属页面
+        seen_lock = threading.Lock()
+        stop_event = threading.Event()
+        page_fingerprints = {}
+        window = self.listing_window_size()
+        total_pages = None
+        futures = {}
+        streamed_links = {}  # 页码 -> 滚动加载期间已加入的项目链接
+
+        def listing_fetch(page):
+            page_links = streamed_links.setdefault(page, [])
+
+            def sink(links):
+                with seen_lock:
+                    self.collect_listing_links(links, seen, page_links, on_links)
+            return ListingFetch(sink, stop_event)
+
+        executor = ThreadPoolExecutor(max_workers=window) if window > 1 else None
+        try:
+            while True:
+                if executor:
+                    # 预取窗口内的后续页面（已知总页数时不超过最后一页）
+                    last_page = current_page + window - 1
+                    if total_pages:
+                        last_page = min(last_page, total_pages)
+                    for page in range(current_page, last_page + 1):
+                        if page not in futures:
+                            futures[page] = executor.submit(self.fetch_listing_page, page, listing_fetch(page))
+                    html = futures.pop(current_page).result()
+                else:
+                    html = self.fetch_listing_page(current_page, listing_fetch(current_page))
+
+                # 浏览器滚动加载期间新出现的项目链接已经加入本页
+                page_links = streamed_links.pop(current_page)
+                with seen_lock:
+                    if not self.process_listing_page(current_page, html, seen, page_links, on_links, page_fingerprints):
+                        break
+                all_program_links.extend(page_links)
+                if total_pages is None:
+                    total_pages = self.listing_page_count(html, len(page_links), current_page)
+                if total_pages and current_page >= total_pages:
+                    self.logger.info(f"已获取全部 {total_pages} 页众测项目")
+                    self.checkpoint.record_listing_complete()
+                    break
+                current_page += 1
+                if backpressure:
+                    backpressure()
+        finally:
+            # 停止后取消尚未开始的预取请求，正在进行的请求在下一次滚动前中止，等待它们结束后再返回
+            stop_event.set()
+            if executor:
+                for future in futures.values():
+                    future.cancel()
+                executor.shutdown(wait=True)
+
+        self.logger.info(f"总共找到 {len(all_program_links)} 个众测项目链接")
+        return all_program_links
+
+    async def get_all_programs_async(self, on_links=None, backpressure=None):
+        """异步获取所有众测项目链接，on_links在每批新项目链接出现时立即被调用，backpressure为每页处理完后等待的协程函数"""
+        if self.use_api:
+            # API模式基于连接池化的requests会话，在线程池中执行，每页的新链接和背压等待交回事件循环
+            loop = asyncio.get_running_loop()
+            api_on_links = (lambda links: loop.call_soon_threadsafe(on_links, links)) if on_links else None
+            api_backpressure = (lambda: asyncio.run_coroutine_threadsafe(backpressure(), loop).result()) if backpressure else None
+            return await loop.run_in_executor(None, self.api_get_all_programs, api_on_links, api_backpressure)
+
+        all_program_links, current_page, listing_complete = self.resume_listing()
+        if on_links and all_program_links:
+            on_links(list(all_program_links))
+        if listing_complete:
+            return all_program_links
+
+        seen = set(all_program_links)
+        stop_event = threading.Event()
+        page_fingerprints = {}
+        window = self.listing_window
+        total_pages = None
+        tasks = {}
+        streamed_links = {}  # 页码 -> 滚动加载期间已加入的项目链接
+
+        loop = asyncio.get_running_loop()
+        loop_thread = threading.get_ident()
+
+        def listing_fetch(page):
+            page_links = streamed_links.setdefault(page, [])
+
+            def sink(links):
+                # 回退到线程池的后端在工作线程中滚动加载，新链接交回事件循环处理
+                if threading.get_ident() == loop_thread:
+                    self.collect_listing_links(links, seen, page_links, on_links)
+                else:
+                    loop.call_soon_threadsafe(self.collect_listing_links, links, seen, page_links, on_links)
+            return ListingFetch(sink, stop_event)
+
+        try:
+            while True:
+                if window > 1:
+                    # 预取窗口内的后续页面（已知总页数时不超过最后一页）
+                    last_page = current_page + window - 1
+                    if total_pages:
+                        last_page = min(last_page, total_pages)
+                    for page in range(current_page, last_page + 1):
+                        if page not in tasks:
+                            tasks[page] = asyncio.ensure_future(self.fetch_listing_page_async(page, listing_fetch(page)))
+                    html = await tasks.pop(current_page)
+                else:
+                    html = await self.fetch_listing_page_async(current_page, listing_fetch(current_page))
+
+                # 浏览器滚动加载期间新出现的项目链接已经加入本页
+                page_links = streamed_links.pop(current_page)
+                if not self.process_listing_page(current_page, html, seen, page_links, on_links, page_fingerprints):
+                    break
+                all_program_links.extend(page_links)
+                if total_pages is None:
+                    total_pages = self.listing_page_count(html, len(page_links), current_page)
+                if total_pages and current_page >= total_pages:
+                    self.logger.info(f"已获取全部 {total_pages} 页众测项目")
+                    self.checkpoint.record_listing_complete()
+                    break
+                current_page += 1
+                if backpressure:
+                    await backpressure()
+        finally:
+            # 停止后取消仍在进行的预取请求，并等待它们结束后再返回
+            stop_event.set()
+            for task in tasks.values():
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks.values(), return_exceptions=True)
 
         self.logger.info(f"总共找到 {len(all_program_links)} 个众测项目链接")
         return all_program_links
 
     def save_progress(self):
-        """保存当前进度"""
-        temp_file = f"{self.output_file}.tmp"
+        """保存当前进度和项目指纹，中断后重新运行时两者都不会丢失"""
+        saved = self.save_domain_progress()
+        self.save_fingerprints()
+        return saved
+
+    def save_domain_progress(self):
+        """保存域名进度：只追加上次保存后新增的记录，日志足够大时再压缩为快照"""
+        if self.store:
+            try:
+                self.store.flush()
+                self.logger.info(f"进度已提交到数据库: {self.store.path}")
+                return True
+            except Exception as e:
+                self.logger.error(f"保存进度失败: {e}")
+                return False
+
+        # 在锁内取出待写入的记录，避免与工作线程的写入冲突
+        with self.result_lock:
+            records, self._pending_records = self._pending_records, []
         try:
-            with open(temp_file, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(['domain', 'url'])
-                for domain, url in sorted(self.domain_url_map.items()):
-                    writer.writerow([domain, url])
-            self.logger.info(f"进度已保存到临时文件: {temp_file}")
+            self.progress_log.append(records)
+            if self.progress_log.needs_compaction():
+                with self.result_lock:
+                    items = list(self.domain_url_map.items())
+                self.progress_log.compact(items)
+                self.logger.info(f"进度日志已压缩到快照: {self.progress_log.snapshot_path}, 共 {len(items)} 条记录")
+            self.logger.info(f"进度已保存: 新增 {len(records)} 条记录")
             return True
         except Exception as e:
+            # 写入失败的记录放回队列，下次保存时重试
+            with self.result_lock:
+                self._pending_records[:0] = records
             self.logger.error(f"保存进度失败: {e}")
             return False
 
     def load_progress(self):
-        """加载之前保存的进度"""
-        temp_file = f"{self.output_file}.tmp"
+        """加载之前保存的进度：读取快照后重放追加日志"""
+        if self.store:
+            # 历史结果保存在数据库中，不再载入内存，导出时直接查询
+            self.logger.info(f"数据库中已有 {self.store.count_domains()} 个域名: {self.store.path}")
+            return True
         try:
-            with open(temp_file, 'r', encoding='utf-8') as csvfile:
-                reader = csv.reader(csvfile)
-                next(reader)  # 跳过标题行
-                for row in reader:
-                    if row and len(row) >= 2:
-                        domain = row[0]
-                        url = row[1]
-                        self.domains.add(domain)
-                        self.domain_url_map[domain] = url
-            self.logger.info(f"从临时文件加载进度: {temp_file}, 已加载 {len(self.domains)} 个域名和URL")
+            items = self.progress_log.load()
+            if items is None:
+                self.logger.info("没有找到之前保存的进度")
+                return False
+            with self.result_lock:
+                self.domains.update(items)
+                self.domain_url_map.update(items)
+            self.logger.info(f"从临时文件加载进度: {self.progress_log.snapshot_path}, 已加载 {len(self.domains)} 个域名和URL")
             return True
         except Exception as e:
             self.logger.error(f"加载进度失败: {e}")
             return False
 
+    def _fetch_is_thread_safe(self):
+        """判断send_request是否可以被多个线程同时调用"""
+        # 单个共享的WebDriver实例需要串行访问，WebDriver池可以并行借出
+        return not (hasattr(self, 'driver') and self.driver)
+
+    def stored_domains(self, program_url, stored):
+        """上次爬取记录的项目域名：指纹记录中没有域名时从数据库读取，都没有时返回None"""
+        if stored.get('domains') is not None:
+            return stored['domains']
+        if self.store:
+            return self.store.program_domains(program_url)
+        return None
+
+    def resume_listing(self):
+        """从检查点恢复已获取的列表页，返回(已有的项目链接, 下一个要获取的页码, 列表是否已全部获取)"""
+        program_links = []
+        for program_url, updated_at in self.checkpoint.listing():
+            program_links.append(program_url)
+            if updated_at:
+                self.program_updated_at[program_url] = updated_at
+        next_page = self.checkpoint.last_page + 1
+        if self.checkpoint.listing_complete:
+            self.logger.info(f"从检查点恢复完整的项目列表，共 {len(program_links)} 个项目链接")
+        elif program_links:
+            self.logger.info(f"从检查点恢复前 {next_page - 1} 页的 {len(program_links)} 个项目链接，从第 {next_page} 页继续")
+        return program_links, next_page, self.checkpoint.listing_complete
+
+    def checkpoint_listing_page(self, page, program_links, offset=None):
+        """在检查点中记录一个列表页的项目链接及其更新时间，API模式同时记录列表的原始偏移量"""
+        self.checkpoint.record_page(page, [(url, self.program_updated_at.get(url)) for url in program_links], offset)
+
+    def pending_programs(self, program_links):
+        """根据检查点过滤项目：已完成的直接恢复域名，失败次数达到上限的跳过，返回仍需爬取的项目链接"""
+        remaining = []
+        completed = given_up = 0
+        for program_url in program_links:
+            if program_url in self.checkpoint.completed:
+                # 不保留域名时本次运行中完成的项目已经记录过，取不到域名
+                domains = self.checkpoint.completed_domains(program_url)
+                if domains is not None:
+                    self._record_domains(domains, program_url)
+                    if self.fingerprints.get(program_url) is None:
+                        # 上次运行在保存指纹之前中断时，用检查点中的域名补上指纹记录
+                        self.fingerprints.put(program_url, domains_fingerprint(domains), domains,
+                                              self.program_updated_at.get(program_url))
+                completed += 1
+            elif self.checkpoint.failures.get(program_url, 0) >= self.max_retries:
+                given_up += 1
+            else:
+                remaining.append(program_url)
+
+        if completed or given_up:
+            self.logger.info(f"从检查点恢复: {completed} 个项目已完成，{given_up} 个项目失败次数已达上限 ({self.max_retries}) 不再重试，"
+                             f"还需爬取 {len(remaining)} 个项目")
+        return remaining
+
+    def finish_program(self, program_url, domains, error=None):
+        """在检查点中记录项目的爬取结果，domains为None表示失败"""
+        if self.store:
+            self.store.record_attempt(program_url, 'failed' if domains is None else 'ok',
+                                      len(domains or []), error)
+        if domains is not None:
+            self.checkpoint.record_done(program_url, domains)
+            return
+        attempts = self.checkpoint.record_failure(program_url, error)
+        self.logger.warning(f"项目爬取失败 (累计 {attempts} 次): {program_url}")
+
+    def finish_crawl(self):
+        """爬取完成后保存结果；项目列表已全部获取时删除检查点，否则保留以便下次继续"""
+        self.save_progress()
+        self.progress_log.close()
+        if self.unchanged_count:
+            self.logger.info(f"增量爬取: 共 {self.unchanged_count} 个项目未变化，复用了上次的结果")
+        if self.checkpoint.listing_complete:
+            self.checkpoint.clear()
+        else:
+            self.checkpoint.close()
+            self.logger.warning(f"项目列表未全部获取，保留检查点 {self.checkpoint.path}，下次运行将从断点继续")
+
+    def skip_unchanged_programs(self, program_links):
+        """根据列表中的更新时间跳过未更新的项目，直接复用上次记录的域名，返回仍需爬取的项目链接"""
+        if self.full_recrawl or not len(self.fingerprints):
+            return program_links
+
+        remaining = []
+        skipped = 0
+        for program_url in program_links:
+            stored = self.fingerprints.get(program_url)
+            updated_at = self.program_updated_at.get(program_url)
+            unchanged = False
+            if stored and updated_at:
+                if stored.get('updated_at') == updated_at:
+                    unchanged = True  # 列表中的更新时间与上次爬取时相同
+                elif self.since:
+                    updated_time = parse_timestamp(updated_at)
+                    unchanged = updated_time is not None and updated_time < self.since
+            domains = self.stored_domains(program_url, stored) if unchanged else None
+            if domains is not None:
+                self._record_domains(domains, program_url)
+                skipped += 1
+            else:
+                # 没有历史记录或更新时间的项目仍需爬取
+                remaining.append(program_url)
+
+        if skipped:
+            with self.result_lock:
+                self.unchanged_count += skipped
+            self.logger.info(f"增量爬取: {skipped} 个项目未更新，复用上次的域名，还需爬取 {len(remaining)} 个项目")
+        return remaining
+
+    def iter_programs(self, buffer_size=PROGRAM_BUFFER_SIZE):
+        """边获取列表页边逐个产出需要爬取的项目链接：列表在后台线程中获取，缓冲区满时暂停获取列表页"""
+        if not self._fetch_is_thread_safe() or (self.use_playwright and self.page and not self.page_pool):
+            # 共享的浏览器实例不能同时获取列表页和详情页，先获取完整列表
+            yield from self.skip_unchanged_programs(self.pending_programs(self.get_all_programs()))
+            return
+
+        stream = ProgramStream(buffer_size)
+
+        def produce():
+            error = None
+            try:
+                self.get_all_programs(on_links=lambda links: stream.put(self.skip_unchanged_programs(self.pending_programs(links))),
+                                      backpressure=stream.wait_for_room)
+            except ListingAborted:
+                pass
+            except Exception as e:
+                error = e
+            stream.finish(error)
+
+        producer = threading.Thread(target=produce, name='program-listing', daemon=True)
+        producer.start()
+        try:
+            yield from stream
+        finally:
+            # 消费者提前退出时让列表获取在下一页之前停止
+            stream.close()
+
+    def crawl_program(self, program_url):
+        """获取并解析单个项目详情页面，可在工作线程中调用，页面获取失败时返回None"""
+        if self.use_api:
+            return self.api_crawl_program(program_url)
+        html = self.fetch_page(program_url)
+        if not html:
+            return None
+        return self.parse_program_details(html, program_url)
+
     def crawl_domains(self, progress_interval=10):
-        """爬取所有众测项目的域名和URL，定期保存进度"""
+        """爬取所有众测项目的域名和URL，定期保存进度
+
+        使用数据库存储时结果不载入内存，返回空集合，结果从数据库导出到结果文件
+        """
         # 尝试加载之前的进度
         self.load_progress()
 
-        program_links = self.get_all_programs()
+        workers = self.workers
+        if self.use_playwright and self.playwright_pages and self.playwright_pages > 1 and not self.page_pool:
+            self.start_page_pool()
+            if workers == 1:
+                # 每个工作线程借出一个页面，默认让线程数与页面数一致
+                workers = self.playwright_pages
+                self.logger.info(f"已启用Playwright页面池，使用 {workers} 个工作线程")
+        elif self.driver_pool and workers == 1:
+            workers = self.driver_pool.size
+            self.logger.info(f"已启用WebDriver池，使用 {workers} 个工作线程")
+
+        try:
+            # 列表页一边获取，详情页一边爬取
+            program_links = self.iter_programs()
+
+            if workers > 1 and self.use_playwright and self.page:
+                # Playwright同步API的页面只能在创建它的线程中使用
+                self.logger.warning("Playwright模式下的页面对象不支持多线程访问，将使用单线程爬取，可通过--playwright-pages启用页面池")
+                workers = 1
+
+            if self.processes > 1:
+                self.crawl_programs_multiprocess(program_links, progress_interval)
+            elif workers > 1:
+                self.crawl_programs_concurrently(program_links, progress_interval, workers)
+            else:
+                processed_count = 0
+                for i, program_url in enumerate(program_links, 1):
+                    self.logger.info(f"正在爬取第 {i} 个项目: {program_url}")
+                    try:
+                        domains = self.crawl_program(program_url)
+                    except Exception as e:
+                        self.logger.error(f"爬取项目失败: {program_url}, 错误: {e}")
+                        self.finish_program(program_url, None, str(e))
+                    else:
+                        self.finish_program(program_url, domains)
+                        if domains is not None:
+                            self.logger.info(f"从该项目获取了 {len(domains)} 个域名和URL")
+
+                    processed_count += 1
+                    # 定期保存进度
+                    if processed_count % progress_interval == 0:
+                        self.save_progress()
+        finally:
+            self.close_page_pool()
+
+        # 爬取完成后保存最终结果
+        self.finish_crawl()
+        self.logger.info(f"总共获取了 {self.domain_count()} 个唯一域名和URL")
+        return self.domains
+
+    def crawl_programs_concurrently(self, program_links, progress_interval=10, workers=None):
+        """使用线程池并发爬取项目详情，项目链接可以边发现边提交，进度在主线程中统一保存"""
+        workers = workers or self.workers
+        self.logger.info(f"使用 {workers} 个工作线程并发爬取项目")
         processed_count = 0
+        pending_links = enumerate(program_links, 1)
+        exhausted = False
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {}
+            while True:
+                # 同时提交的任务数有上限，列表发现的速度受详情爬取的速度约束
+                while not exhausted and len(futures) < workers * 2:
+                    try:
+                        i, program_url = next(pending_links)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    futures[executor.submit(self.crawl_program, program_url)] = (i, program_url)
+                if not futures:
+                    break
+
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i, program_url = futures.pop(future)
+                    try:
+                        domains = future.result()
+                    except Exception as e:
+                        self.logger.error(f"爬取项目失败: {program_url}, 错误: {e}")
+                        self.finish_program(program_url, None, str(e))
+                    else:
+                        self.finish_program(program_url, domains)
+                        if domains is not None:
+                            self.logger.info(f"已完成第 {i} 个项目: {program_url}，获取了 {len(domains)} 个域名和URL")
+
+                    processed_count += 1
+                    # 定期保存进度
+                    if processed_count % progress_interval == 0:
+                        self.save_progress()
+
+    def crawl_programs_multiprocess(self, program_links, progress_interval=10, processes=None):
+        """使用多个工作进程爬取项目详情，每个进程拥有独立的浏览器后端，项目链接可以边发现边分发，结果在主进程中汇总"""
+        processes = processes or self.processes
+        self.logger.info(f"使用 {processes} 个工作进程爬取项目")
+
+        # 工作进程复用主进程的登录Cookie，不再重复登录，也不再嵌套并发
+        # 每个工作进程各有一个限速器，总速率预算按进程数平分，避免随进程数成倍增加
+        limiter = self.rate_limiter
+        worker_kwargs = dict(self._init_kwargs, playwright_login=False, workers=1, processes=1,
+                             use_async=False, playwright_pages=None, selenium_drivers=1, store='csv',
+                             rps=limiter.rate / processes if limiter.rate else None,
+                             per_host_rps=limiter.per_host_rate / processes if limiter.per_host_rate else None,
+                             max_rps=limiter.max_rate / processes if limiter.max_rate else None)
+        # 浏览器后端与fork不兼容，统一使用spawn启动工作进程
+        ctx = multiprocessing.get_context('spawn')
+        # 待分发队列有上限，列表发现的速度受工作进程的速度约束
+        url_queue = ctx.Queue(maxsize=processes * 2)
+        result_queue = ctx.Queue()
+        workers = [ctx.Process(target=_process_worker, args=(worker_kwargs, self.cookies, url_queue, result_queue), daemon=True)
+                   for _ in range(processes)]
+        for worker in workers:
+            worker.start()
+
+        # 在后台线程中边发现边分发项目链接
+        submitted = [0]
+        feed_errors = []
+        feeding_done = threading.Event()
+
+        def feed():
+            try:
+                for program_url in program_links:
+                    url_queue.put(program_url)
+                    submitted[0] += 1
+            except Exception as e:
+                feed_errors.append(e)
+            finally:
+                feeding_done.set()
+                for _ in workers:
+                    url_queue.put(None)  # 结束标记
+
+        feeder = threading.Thread(target=feed, name='program-feeder', daemon=True)
+        feeder.start()
+
+        processed_count = 0
+        try:
+            while not (feeding_done.is_set() and processed_count >= submitted[0]):
+                try:
+                    program_url, records, fingerprint, error = result_queue.get(timeout=5)
+                except queue.Empty:
+                    if feeding_done.is_set() and processed_count >= submitted[0]:
+                        break
+                    if not any(worker.is_alive() for worker in workers):
+                        self.logger.error(f"所有工作进程已退出，还有 {submitted[0] - processed_count} 个已分发的项目未完成")
+                        break
+                    continue
 
-        for i, program_url in enumerate(program_links, 1):
-            # 检查是否已经处理过该项目（可以根据需要实现）
-            self.logger.info(f"正在爬取第 {i}/{len(program_links)} 个项目: {program_url}")
-            html = self.send_request(program_url)
-            domains = self.parse_program_details(html, program_url)
-            self.logger.info(f"从该项目获取了 {len(domains)} 个域名和URL")
+                if error:
+                    self.logger.error(f"爬取项目失败: {program_url}, 错误: {error}")
+                    self.finish_program(program_url, None, error)
+                else:
+                    self.finish_program(program_url, [domain for domain, _ in records])
+                    self._record_domains([domain for domain, _ in records], program_url)
+                if fingerprint:
+                    # 工作进程中没有列表页的更新时间，由主进程补上
+                    fingerprint['updated_at'] = self.program_updated_at.get(program_url)
+                    self.fingerprints.update(program_url, fingerprint)
+                processed_count += 1
+                self.logger.info(f"已完成第 {processed_count} 个项目: {program_url}，获取了 {len(records)} 个域名和URL")
+
+                # 定期保存进度
+                if processed_count % progress_interval == 0:
+                    self.save_progress()
+        finally:
+            for worker in workers:
+                worker.join(timeout=30)
+                if worker.is_alive():
+                    worker.terminate()
+        if feed_errors:
+            raise feed_errors[0]
+
+    async def crawl_domains_async(self, progress_interval=10, concurrency=None):
+        """在单个事件循环中异步爬取所有众测项目，列表页边获取边分发给固定数量的爬取协程
+
+        返回值与crawl_domains相同
+        """
+        concurrency = concurrency or self.concurrency
+        # 尝试加载之前的进度
+        self.load_progress()
 
-            processed_count += 1
-            # 定期保存进度
-            if processed_count % progress_interval == 0:
-                self.save_progress()
+        await self.start_async_backends(concurrency)
+        try:
+            self.logger.info(f"使用asyncio爬取项目，最大并发请求数: {concurrency}")
+            # 列表页一边获取，详情页一边由固定数量的协程爬取；缓冲区满时暂停获取列表页
+            program_queue = asyncio.Queue()
+            has_room = asyncio.Event()
+            has_room.set()
+            processed_count = 0
+
+            def on_links(links):
+                for program_url in self.skip_unchanged_programs(self.pending_programs(links)):
+                    program_queue.put_nowait(program_url)
+                if program_queue.qsize() >= PROGRAM_BUFFER_SIZE:
+                    has_room.clear()
+
+            async def produce():
+                await self.get_all_programs_async(on_links=on_links, backpressure=has_room.wait)
+                for _ in range(concurrency):
+                    program_queue.put_nowait(None)  # 结束标记
+
+            async def crawl_one(program_url):
+                try:
+                    if self.use_api:
+                        loop = asyncio.get_running_loop()
+                        return await loop.run_in_executor(None, self.api_crawl_program, program_url)
+                    html = await self.async_send_request(program_url)
+                    if not html:
+                        return None
+                    return self.parse_program_details(html, program_url)
+                except Exception as e:
+                    self.logger.error(f"爬取项目失败: {program_url}, 错误: {e}")
+                    return None
+
+            async def worker():
+                nonlocal processed_count
+                while True:
+                    program_url = await program_queue.get()
+                    if program_queue.qsize() < PROGRAM_BUFFER_SIZE:
+                        has_room.set()
+                    if program_url is None:
+                        return
+                    domains = await crawl_one(program_url)
+                    self.finish_program(program_url, domains)
+                    processed_count += 1
+                    if domains is not None:
+                        self.logger.info(f"已完成第 {processed_count} 个项目: {program_url}，获取了 {len(domains)} 个域名和URL")
+
+                    # 定期保存进度
+                    if processed_count % progress_interval == 0:
+                        self.save_progress()
+
+            workers = [asyncio.ensure_future(worker()) for _ in range(concurrency)]
+            try:
+                await produce()
+            except BaseException:
+                # 获取列表失败时立即取消爬取协程，不再处理缓冲区中剩余的项目
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                raise
+            await asyncio.gather(*workers)
+        finally:
+            await self.close_async_backends()
 
         # 爬取完成后保存最终结果
-        self.save_progress()
-        self.logger.info(f"总共获取了 {len(self.domains)} 个唯一域名和URL")
+        self.finish_crawl()
+        self.logger.info(f"总共获取了 {self.domain_count()} 个唯一域名和URL")
         return self.domains
 
+    def save_fingerprints(self):
+        """保存项目指纹，供下次增量爬取使用"""
+        try:
+            if self.fingerprints.save():
+                self.logger.debug(f"项目指纹已保存到 {self.fingerprints.path}")
+        except Exception as e:
+            self.logger.error(f"保存项目指纹失败: {e}")
+
     def save_domains(self):
-        """保存域名和URL到CSV文件"""
-        with open(self.output_file, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(['domain', 'url'])
-            for domain, url in sorted(self.domain_url_map.items()):
-                writer.writerow([domain, url])
+        """保存域名和URL到结果文件（CSV、Parquet或Feather）"""
+        if self.store:
+            # 结果文件只是数据库当前范围的导出
+            if self.output_format == 'csv':
+                # 按域名索引顺序流式写出
+                count = self.store.export_csv(self.output_file)
+                self.logger.info(f"已从数据库导出 {count} 个域名和URL到 {self.output_file}")
+            else:
+                write_domains(self.store.current_assets(), self.output_file, self.output_format)
+                self.logger.info(f"已从数据库导出域名和URL到 {self.output_file} ({self.output_format})")
+            return
+        write_domains(sorted(self.domain_url_map.items()), self.output_file, self.output_format)
         self.logger.info(f"域名和URL已保存到 {self.output_file}")
 
+    def diff_results(self):
+        """将本次结果与diff_against指定的结果文件比较，变化写入<输出文件名>.diff<扩展名>"""
+        try:
+            # 使用数据库存储时直接与数据库中的当前范围比较
+            current = domains_frame(self.store.current_assets()) if self.store else read_domains(self.output_file)
+            diff = diff_domains(read_domains(self.diff_against), current)
+            base, ext = os.path.splitext(self.output_file)
+            diff_file = f"{base}.diff{ext}"
+            if self.output_format == 'parquet':
+                diff.to_parquet(diff_file, index=False)
+            elif self.output_format == 'feather':
+                diff.to_feather(diff_file)
+            else:
+                diff.to_csv(diff_file, index=False)
+            counts = diff['change'].value_counts()
+            self.logger.info(f"与 {self.diff_against} 相比: 新增 {counts.get('added', 0)} 个域名，移除 {counts.get('removed', 0)} 个，"
+                             f"所属项目变化 {counts.get('moved', 0)} 个，详情已保存到 {diff_file}")
+            return diff
+        except Exception as e:
+            self.logger.error(f"比较结果文件失败: {e}")
+            return None
+
     def run(self):
         """运行爬虫"""
         self.logger.info("开始爬取HackerOne众测域名")
         start_time = time.time()
+        if self.checkpoint.has_state():
+            self.logger.info(f"发现检查点 {self.checkpoint.path}（{len(self.checkpoint.pages)} 个列表页，"
+                             f"{len(self.checkpoint.completed)} 个已完成项目，{len(self.checkpoint.failures)} 个失败项目），将从断点继续")
 
         try:
-            self.crawl_domains()
+            if self.use_async:
+                # 同步Playwright不能与asyncio事件循环共存，先导出登录状态再释放
+                self.release_sync_playwright()
+                asyncio.run(self.crawl_domains_async())
+            else:
+                self.crawl_domains()
             self.save_domains()
+            if self.diff_against:
+                self.diff_results()
         except Exception as e:
             self.logger.error(f"爬虫运行出错: {e}")
         finally:
+            if self.response_cache:
+                self.response_cache.flush()
+                stats = self.response_cache.stats()
+                self.logger.info(f"响应缓存: {stats['entries']} 个条目, 直接命中 {stats['hits']} 次, "
+                                 f"304重新验证 {stats['revalidated']} 次, 重新下载 {stats['misses']} 次")
+            if self.lean_profile and self.lean_profile.blocked_count:
+                self.logger.info(f"精简渲染: 共拦截 {self.lean_profile.blocked_count} 个Playwright请求")
             end_time = time.time()
             self.logger.info(f"爬虫运行完成，耗时: {end_time - start_time:.2f} 秒")
 
@@ -1173,6 +2470,44 @@ def parse_arguments():
     parser.add_argument('-r', '--max-retries', type=int, default=3, help='最大重试次数 (默认: 3)')
     parser.add_argument('-b', '--backoff-factor', type=float, default=0.3, help='退避因子 (默认: 0.3)')
     parser.add_argument('-i', '--progress-interval', type=int, default=10, help='进度保存间隔 (默认: 10)')
+    parser.add_argument('-w', '--workers', type=int, default=1, help='并发爬取项目详情的线程数 (默认: 1)')
+    parser.add_argument('--async', dest='use_async', action='store_true', help='使用asyncio异步爬取（需要aiohttp，Playwright模式使用异步API）')
+    parser.add_argument('--concurrency', type=int, default=50, help='异步模式下的最大并发请求数 (默认: 50)')
+    parser.add_argument('--playwright-pages', type=int, default=None, help='Playwright页面池大小，大于1时在同一个Chromium实例中并行渲染 (异步模式默认: 8)')
+    parser.add_argument('--selenium-drivers', type=int, default=1, help='Selenium WebDriver池大小，大于1时并行使用多个Chrome实例 (默认: 1)')
+    parser.add_argument('--driver-max-pages', type=int, default=50, help='每个WebDriver实例加载多少个页面后回收 (默认: 50)')
+    parser.add_argument('--processes', type=int, default=1, help='多进程模式的工作进程数，每个进程拥有独立的浏览器 (默认: 1)')
+    parser.add_argument('--parser', dest='parser_engine', choices=PARSER_ENGINES, default='auto', help='HTML解析引擎，auto按selectolax、lxml、html.parser顺序选择可用的引擎 (默认: auto)')
+    parser.add_argument('--api', dest='use_api', action='store_true', help='直接请求GraphQL数据接口获取项目列表和范围，不渲染HTML')
+    parser.add_argument('--api-page-size', type=int, default=API_PAGE_SIZE, help=f'API模式下每次请求的条目数 (默认: {API_PAGE_SIZE})')
+    parser.add_argument('--cache-dir', help='HTTP响应缓存目录，启用后用ETag/Last-Modified条件请求重新验证页面')
+    parser.add_argument('--max-cache-age', type=int, default=DEFAULT_MAX_AGE, help=f'详情页缓存有效期（秒），有效期内不发请求，列表页总是重新验证 (默认: {DEFAULT_MAX_AGE})')
+    parser.add_argument('--max-cache-size', type=int, default=DEFAULT_MAX_SIZE, help=f'缓存总大小上限（字节），超出时淘汰最久未使用的页面 (默认: {DEFAULT_MAX_SIZE})')
+    parser.add_argument('--since', help='只爬取列表中标记为在此时间之后更新过的项目，如 2024-01-01 或 2024-01-01T00:00:00Z')
+    parser.add_argument('--full-recrawl', action='store_true', help='忽略上次保存的项目指纹，重新爬取并解析所有项目')
+    parser.add_argument('--store', default='csv', help='结果存储后端: csv 或 sqlite:路径，如 sqlite:hackerone.db (默认: csv)')
+    parser.add_argument('--output-format', choices=OUTPUT_FORMATS, default='auto',
+                        help='结果文件格式，auto按输出文件扩展名选择（.parquet/.feather），Parquet/Feather需要pyarrow (默认: auto)')
+    parser.add_argument('--diff-against', help='爬取完成后与此结果文件（CSV/Parquet/Feather）比较，输出新增、移除和所属项目变化的域名')
+    parser.add_argument('--rps', type=float, help='全局起始请求速率（请求数/秒），默认为平均请求间隔(--delay)的倒数乘以并发数（线程数、页面池/WebDriver池大小或异步并发数，再乘以进程数）')
+    parser.add_argument('--per-host-rps', type=float, help='每个主机的起始请求速率（请求数/秒），默认不单独限制')
+    parser.add_argument('--max-rps', type=float, help='服务端响应正常时自适应提速的上限 (默认: 起始速率的10倍)')
+    parser.add_argument('--ready-quiet-ms', type=int, default=DEFAULT_QUIET_MS,
+                        help=f'浏览器模式下关键元素出现且DOM静默多少毫秒视为页面渲染完成 (默认: {DEFAULT_QUIET_MS})')
+    parser.add_argument('--ready-timeout', type=float, default=DEFAULT_READY_TIMEOUT,
+                        help=f'浏览器模式下等待页面渲染完成的最长时间（秒） (默认: {DEFAULT_READY_TIMEOUT})')
+    parser.add_argument('--lean', action='store_true', help='精简渲染模式：浏览器拦截图片、字体等资源和第三方统计脚本，页面加载只等待DOM就绪')
+    parser.add_argument('--block-resources', default=','.join(DEFAULT_BLOCKED_RESOURCE_TYPES),
+                        help=f'精简渲染模式下拦截的资源类型，逗号分隔，可选image,media,font,stylesheet (默认: {",".join(DEFAULT_BLOCKED_RESOURCE_TYPES)})')
+    parser.add_argument('--block-hosts', help='精简渲染模式下额外拦截的第三方域名，逗号分隔（包括子域名）')
+    parser.add_argument('--capture-json', action='store_true',
+                        help='浏览器模式下捕获页面加载期间的项目列表/范围JSON响应直接解析，不再序列化整个页面DOM')
+    parser.add_argument('--extract-in-page', action='store_true',
+                        help='浏览器模式下在页面中运行提取脚本，只传回范围候选文本和项目链接，不再传回整个页面DOM')
+    parser.add_argument('--listing-window', type=int, default=LISTING_WINDOW,
+                        help=f'并行预取的列表页数，不知道总页数时遇到空页后取消其余预取 (默认: {LISTING_WINDOW})')
+    parser.add_argument('--pool-size', type=int, default=10, help='每个代理的HTTP连接池大小 (默认: 10)')
+    parser.add_argument('--http-retries', type=int, default=3, help='HTTP连接池适配器的自动重试次数 (默认: 3)')
     parser.add_argument('-l', '--log-level', choices=LOG_LEVELS.keys(), default='INFO', help='日志级别 (默认: INFO)')
     parser.add_argument('--driver-path', help='ChromeDriver可执行文件路径', default=None)
     parser.add_argument('--chrome-path', help='Chrome浏览器可执行文件路径', default=None)
@@ -1219,6 +2554,39 @@ def load_proxies_from_file(file_path):
         logger.error(f"加载代理文件失败: {e}")
         return []
 
+def _process_worker(init_kwargs, cookies, url_queue, result_queue):
+    """多进程模式的工作进程：构建独立的浏览器后端，逐个处理项目URL并返回(域名, 项目URL)"""
+    scraper = HackerOneScraper(**init_kwargs)
+    if cookies:
+        scraper.cookies = cookies
+        scraper.session_pool.load_cookies(cookies)
+        if scraper.context:
+            scraper.context.add_cookies(cookies)
+    try:
+        while True:
+            program_url = url_queue.get()
+            if program_url is None:
+                break
+            try:
+                domains = scraper.crawl_program(program_url)
+                if domains is None:
+                    result_queue.put((program_url, [], None, '页面获取失败'))
+                    continue
+                result_queue.put((program_url, [(domain, program_url) for domain in domains],
+                                  scraper.fingerprints.get(program_url), None))
+            except Exception as e:
+                result_queue.put((program_url, [], None, str(e)))
+    finally:
+        if scraper.response_cache:
+            scraper.response_cache.close()
+        if scraper.page:
+            scraper.close_playwright()
+        if scraper.driver:
+            try:
+                scraper.driver.quit()
+            except:
+                pass
+
 class MCPClient:
     """MCP服务器客户端，用于调用MCP服务"""
     def __init__(self, server_name, host='localhost', port=8000):
@@ -1260,6 +2628,280 @@ class MCPClient:
             self.logger.error(f"MCP调用异常: {e}")
             return None
 
+class ListingAborted(Exception):
+    """消费者已停止，列表获取应在下一页之前结束"""
+
+
+class ListingFetch:
+    """一次列表页获取的状态：sink接收滚动加载期间新出现的项目链接，stop_event被设置后获取在下一次滚动前中止"""
+    def __init__(self, sink=None, stop_event=None):
+        self.sink = sink
+        self.stop_event = stop_event
+
+    @property
+    def stopped(self):
+        return bool(self.stop_event and self.stop_event.is_set())
+
+    def check(self):
+        if self.stopped:
+            raise ListingAborted()
+
+
+class ProgramStream:
+    """列表发现与详情爬取之间的有界缓冲区：生产者逐批放入项目链接，消费者逐个取出
+
+    放入从不阻塞（可能在浏览器的回调中调用），生产者在两个列表页之间调用wait_for_room，缓冲区满时在此等待
+    """
+    _DONE = object()
+
+    def __init__(self, maxsize=PROGRAM_BUFFER_SIZE):
+        self.maxsize = maxsize
+        self._items = queue.Queue()
+        self._room = threading.Condition()
+        self._closed = False
+
+    def put(self, program_links):
+        for program_url in program_links:
+            self._items.put(program_url)
+
+    def wait_for_room(self):
+        """缓冲区满时等待消费者取出，消费者已停止时抛出ListingAborted"""
+        with self._room:
+            while not self._closed and self._items.qsize() >= self.maxsize:
+                self._room.wait(timeout=1)
+            if self._closed:
+                raise ListingAborted()
+
+    def finish(self, error=None):
+        """生产者结束，error不为None时在消费者中重新抛出"""
+        self._items.put((self._DONE, error))
+
+    def close(self):
+        with self._room:
+            self._closed = True
+            self._room.notify_all()
+
+    def __iter__(self):
+        while True:
+            item = self._items.get()
+            if isinstance(item, tuple) and item and item[0] is self._DONE:
+                if item[1] is not None:
+                    raise item[1]
+                return
+            with self._room:
+                self._room.notify_all()
+            yield item
+
+
+class AsyncLoopThread:
+    """在后台线程中运行事件循环，供同步代码提交协程并等待结果"""
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def run(self, coro, timeout=None):
+        """提交协程到后台事件循环，阻塞等待其结果"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def stop(self):
+        """停止事件循环并等待后台线程退出"""
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+class PlaywrightPagePool:
+    """Playwright页面池：一个Chromium实例中的多个上下文，每个上下文一个页面"""
+    def __init__(self, size=ASYNC_BROWSER_PAGES, storage_state=None, headless=True, logger=None, lean_profile=None):
+        self.size = max(1, size)
+        self.storage_state = storage_state  # 登录后的状态，每个上下文都以它为种子
+        self.lean_profile = lean_profile  # 精简渲染配置，每个上下文都安装请求拦截
+        self.headless = headless
+        self.logger = logger or logging.getLogger(__name__)
+        self._playwright = None
+        self._browser = None
+        self._idle = None
+
+    async def _new_page(self):
+        """创建一个带登录状态的上下文及其页面"""
+        context = await self._browser.new_context(
+            viewport={'width': 1920, 'height': 1080},
+            user_agent=random.choice(USER_AGENTS),
+            storage_state=self.storage_state
+        )
+        if self.lean_profile:
+            await self.lean_profile.install_playwright_async(context)
+        return await context.new_page()
+
+    async def start(self):
+        """启动浏览器并预先创建所有页面"""
+        if not playwright_available:
+            raise RuntimeError("Playwright不可用，请先安装Playwright")
+        self.logger.info(f"初始化Playwright页面池，页面数: {self.size}")
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=self.headless, args=PLAYWRIGHT_LAUNCH_ARGS)
+        self._idle = asyncio.Queue()
+        for _ in range(self.size):
+            self._idle.put_nowait(await self._new_page())
+        self.logger.info("Playwright页面池初始化成功")
+
+    async def acquire(self):
+        """借出一个空闲页面，没有空闲页面时等待"""
+        return await self._idle.get()
+
+    async def release(self, page, broken=False):
+        """归还页面；出错的页面会连同上下文一起重建"""
+        if broken:
+            try:
+                await page.context.close()
+            except Exception as e:
+                self.logger.warning(f"关闭出错的Playwright上下文失败: {e}")
+            try:
+                page = await self._new_page()
+            except Exception as e:
+                self.logger.error(f"重建Playwright页面失败: {e}")
+                # 归还一个占位None会导致借出方出错，这里直接缩小池的容量
+                self.size -= 1
+                return
+        self._idle.put_nowait(page)
+
+    @asynccontextmanager
+    async def page(self):
+        """借出页面的上下文管理器，退出时自动归还"""
+        page = await self.acquire()
+        broken = False
+        try:
+            yield page
+        except Exception:
+            broken = True
+            raise
+        finally:
+            await self.release(page, broken)
+
+    async def close(self):
+        """关闭所有上下文和浏览器"""
+        try:
+            if self._browser:
+                await self._browser.close()
+            if self._playwright:
+                await self._playwright.stop()
+            self.logger.info("Playwright页面池已关闭")
+        finally:
+            self._browser = None
+            self._playwright = None
+
+class WebDriverPool:
+    """Selenium WebDriver池：并行借出和归还，按页面数或出错回收，并在后台预热替换实例"""
+    def __init__(self, factory, size=4, max_pages=50, checkout_timeout=600, logger=None):
+        self.factory = factory  # 创建WebDriver实例的函数
+        self.size = max(1, size)
+        self.max_pages = max_pages  # 每个实例加载多少个页面后回收
+        self.checkout_timeout = checkout_timeout
+        self.logger = logger or logging.getLogger(__name__)
+        self._idle = queue.Queue()  # 可借出的实例
+        self._spares = queue.Queue()  # 预热好的替换实例
+        self._page_counts = {}  # id(driver) -> 已加载页面数
+        self._deficit = 0  # 已回收但尚未补充的实例数
+        self._lock = threading.Lock()
+        self._closed = False
+        self._warmer = ThreadPoolExecutor(max_workers=2, thread_name_prefix='driver-warmer')
+
+    def start(self):
+        """并行创建所有实例，并预热一个备用实例"""
+        self.logger.info(f"初始化WebDriver池，实例数: {self.size}")
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            drivers = list(executor.map(lambda _: self.factory(), range(self.size)))
+        for driver in drivers:
+            self._register(driver)
+            self._idle.put(driver)
+        self._warm()
+
+    def _register(self, driver):
+        with self._lock:
+            self._page_counts[id(driver)] = 0
+
+    def _warm(self):
+        """在后台创建一个新实例"""
+        if not self._closed:
+            self._warmer.submit(self.factory).add_done_callback(self._on_warmed)
+
+    def _on_warmed(self, future):
+        try:
+            driver = future.result()
+        except Exception as e:
+            self.logger.error(f"预热WebDriver失败: {e}")
+            return
+        if self._closed:
+            self._quit(driver)
+            return
+        with self._lock:
+            fill_deficit = self._deficit > 0
+            if fill_deficit:
+                self._deficit -= 1
+        if fill_deficit:
+            self._register(driver)
+            self._idle.put(driver)
+        else:
+            self._spares.put(driver)
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            self.logger.warning(f"关闭WebDriver时出错: {e}")
+
+    def _retire(self, driver):
+        """回收实例：优先用预热好的备用实例替换，旧实例在后台关闭"""
+        with self._lock:
+            self._page_counts.pop(id(driver), None)
+        self._warmer.submit(self._quit, driver)
+        try:
+            replacement = self._spares.get_nowait()
+        except queue.Empty:
+            replacement = None
+            with self._lock:
+                self._deficit += 1
+        if replacement:
+            self._register(replacement)
+            self._idle.put(replacement)
+        # 补充一个实例：没有备用实例时填补空缺，否则作为下一个备用实例
+        self._warm()
+
+    def checkout(self):
+        """借出一个空闲实例，没有空闲实例时等待"""
+        try:
+            return self._idle.get(timeout=self.checkout_timeout)
+        except queue.Empty:
+            raise RuntimeError(f"等待空闲WebDriver超时 ({self.checkout_timeout}秒)")
+
+    def checkin(self, driver, broken=False):
+        """归还实例；出错或达到页面上限的实例会被回收"""
+        with self._lock:
+            pages = self._page_counts.get(id(driver), 0) + 1
+            self._page_counts[id(driver)] = pages
+        if broken or pages >= self.max_pages:
+            reason = "出错" if broken else f"已加载 {pages} 个页面"
+            self.logger.info(f"回收WebDriver实例（{reason}）")
+            self._retire(driver)
+        else:
+            self._idle.put(driver)
+
+    def close(self):
+        """关闭所有实例"""
+        self._closed = True
+        self._warmer.shutdown(wait=True)
+        for pool in (self._idle, self._spares):
+            while True:
+                try:
+                    self._quit(pool.get_nowait())
+                except queue.Empty:
+                    break
+        self.logger.info("WebDriver池已关闭")
+
 if __name__ == '__main__':
     import sys
     args = parse_arguments()
@@ -1303,7 +2945,38 @@ if __name__ == '__main__':
         use_mcp_playwright=args.use_mcp_playwright,
         use_mcp_firecrawl=args.use_mcp_firecrawl,
         mcp_host=args.mcp_host,
-        mcp_port=args.mcp_port
+        mcp_port=args.mcp_port,
+        workers=args.workers,
+        use_async=args.use_async,
+        concurrency=args.concurrency,
+        pool_size=args.pool_size,
+        http_retries=args.http_retries,
+        playwright_pages=args.playwright_pages,
+        selenium_drivers=args.selenium_drivers,
+        driver_max_pages=args.driver_max_pages,
+        processes=args.processes,
+        parser_engine=args.parser_engine,
+        use_api=args.use_api,
+        api_page_size=args.api_page_size,
+        cache_dir=args.cache_dir,
+        max_cache_age=args.max_cache_age,
+        max_cache_size=args.max_cache_size,
+        since=args.since,
+        full_recrawl=args.full_recrawl,
+        store=args.store,
+        output_format=args.output_format,
+        diff_against=args.diff_against,
+        rps=args.rps,
+        per_host_rps=args.per_host_rps,
+        max_rps=args.max_rps,
+        ready_quiet_ms=args.ready_quiet_ms,
+        ready_timeout=args.ready_timeout,
+        lean=args.lean,
+        block_resources=args.block_resources,
+        block_hosts=args.block_hosts,
+        capture_json=args.capture_json,
+        extract_in_page=args.extract_in_page,
+        listing_window=args.listing_window
     )
     
     # 运行爬虫
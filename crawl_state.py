@@ -0,0 +1,316 @@
+import csv
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from columnar_io import detect_format, load_domain_map, write_domains
+
+
+def parse_timestamp(value):
+    """解析ISO 8601时间（支持末尾的Z），没有时区的按UTC处理，无法解析时返回None"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value).strip().replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+class FingerprintStore:
+    """项目指纹存储：每个项目URL对应范围内容的指纹、提取出的域名和列表页中的更新时间
+
+    keep_domains为False时不保存域名（域名已在数据库中），内存占用不随结果总数增长
+    """
+    def __init__(self, path, keep_domains=True):
+        self.path = path
+        self.keep_domains = keep_domains
+        self._lock = threading.Lock()
+        self._entries = self._load()
+        self._dirty = False
+
+    def _load(self):
+        """加载上次运行保存的指纹，文件不存在或损坏时从空记录开始"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            if not isinstance(entries, dict):
+                return {}
+            if not self.keep_domains:
+                for entry in entries.values():
+                    if isinstance(entry, dict):
+                        entry.pop('domains', None)
+            return entries
+        except (OSError, ValueError):
+            return {}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, url):
+        """获取项目的指纹记录，不存在时返回None"""
+        with self._lock:
+            entry = self._entries.get(url)
+            return dict(entry) if entry else None
+
+    def put(self, url, fingerprint, domains, updated_at=None):
+        """记录项目本次爬取得到的指纹和域名"""
+        entry = {
+            'fingerprint': fingerprint,
+            'updated_at': updated_at,
+            'crawled_at': time.time(),
+        }
+        if self.keep_domains:
+            entry['domains'] = list(domains)
+        self.update(url, entry)
+
+    def update(self, url, entry):
+        """直接写入一条指纹记录（用于合并工作进程返回的结果）"""
+        if not entry:
+            return
+        if not self.keep_domains:
+            entry = {key: value for key, value in entry.items() if key != 'domains'}
+        with self._lock:
+            self._entries[url] = entry
+            self._dirty = True
+
+    def save(self):
+        """有变化时原子地写回文件"""
+        with self._lock:
+            if not self._dirty:
+                return False
+            temp_file = self.path + '.tmp'
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(temp_file, self.path)
+            self._dirty = False
+            return True
+
+
+class CheckpointJournal:
+    """项目级检查点日志：以JSON行追加记录已获取的列表页、已完成的项目及其域名、失败项目及尝试次数
+
+    keep_domains为False时本次运行完成的项目只在日志文件中记录域名，内存中不保留
+    """
+    def __init__(self, path, keep_domains=True):
+        self.path = path
+        self.keep_domains = keep_domains
+        self._lock = threading.Lock()
+        self._file = None
+        self.pages = {}  # 页码 -> [(项目链接, 更新时间)]
+        self.offsets = {}  # 页码 -> 该页之后API列表的原始偏移量
+        self.listing_complete = False
+        self.completed = {}  # 项目链接 -> 域名列表（不保留域名时为None）
+        self.failures = {}  # 项目链接 -> 失败次数
+        self._needs_newline = False
+        self._load()
+
+    def _load(self):
+        """重放日志恢复状态，进程中断时写了一半的最后一行直接忽略"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except OSError:
+            return
+        self._needs_newline = bool(lines) and not lines[-1].endswith('\n')
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            kind = record.get('type')
+            if kind == 'page':
+                self.pages[record['page']] = [tuple(item) for item in record['programs']]
+                if record.get('offset') is not None:
+                    self.offsets[record['page']] = record['offset']
+            elif kind == 'listing_complete':
+                self.listing_complete = True
+            elif kind == 'done':
+                self.completed[record['url']] = record['domains']
+                self.failures.pop(record['url'], None)
+            elif kind == 'fail':
+                self.failures[record['url']] = record['attempts']
+
+    def _append(self, record):
+        """追加一条记录并立即刷新到文件，调用方需持有锁"""
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+            if self._needs_newline:
+                # 上次中断时留下了不完整的行，新记录另起一行
+                self._file.write('\n')
+                self._needs_newline = False
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+
+    def has_state(self):
+        """是否有可恢复的检查点"""
+        with self._lock:
+            return bool(self.pages or self.completed or self.failures)
+
+    def completed_domains(self, url):
+        """返回已完成项目记录的域名；不保留域名时取出后即释放，之后返回None"""
+        with self._lock:
+            domains = self.completed.get(url)
+            if domains is not None and not self.keep_domains:
+                self.completed[url] = None
+            return domains
+
+    @property
+    def last_page(self):
+        """已获取的最后一个列表页页码，没有时为0"""
+        with self._lock:
+            return max(self.pages) if self.pages else 0
+
+    @property
+    def next_offset(self):
+        """最后一个已获取的API列表页之后的原始偏移量，没有记录时为None"""
+        with self._lock:
+            return self.offsets.get(max(self.pages)) if self.pages else None
+
+    def listing(self):
+        """按页码顺序返回已获取的所有(项目链接, 更新时间)"""
+        with self._lock:
+            return [item for page in sorted(self.pages) for item in self.pages[page]]
+
+    def record_page(self, page, programs, offset=None):
+        """记录一个已获取的列表页及其中的项目，offset为API列表在该页之后的原始偏移量"""
+        programs = [(url, updated_at) for url, updated_at in programs]
+        record = {'type': 'page', 'page': page, 'programs': programs}
+        with self._lock:
+            self.pages[page] = programs
+            if offset is not None:
+                self.offsets[page] = offset
+                record['offset'] = offset
+            self._append(record)
+
+    def record_listing_complete(self):
+        """记录列表页已全部获取"""
+        with self._lock:
+            self.listing_complete = True
+            self._append({'type': 'listing_complete'})
+
+    def record_done(self, url, domains):
+        """记录项目已完成及提取出的域名"""
+        with self._lock:
+            self.completed[url] = list(domains) if self.keep_domains else None
+            self.failures.pop(url, None)
+            self._append({'type': 'done', 'url': url, 'domains': list(domains)})
+
+    def record_failure(self, url, error=None):
+        """记录项目失败，返回该项目累计的失败次数"""
+        with self._lock:
+            attempts = self.failures.get(url, 0) + 1
+            self.failures[url] = attempts
+            self._append({'type': 'fail', 'url': url, 'attempts': attempts, 'error': error})
+            return attempts
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def clear(self):
+        """爬取完成后删除检查点日志并清空状态"""
+        self.close()
+        with self._lock:
+            self.pages.clear()
+            self.offsets.clear()
+            self.completed.clear()
+            self.failures.clear()
+            self.listing_complete = False
+            self._needs_newline = False
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+
+# 追加日志中的记录数超过此值且超过快照大小时压缩为新快照
+COMPACT_MIN_RECORDS = 1000
+
+
+class ProgressLog:
+    """域名进度的追加写日志：新发现的(域名, 项目URL)批量追加并fsync，定期压缩进快照文件"""
+    def __init__(self, snapshot_path, wal_path, compact_threshold=COMPACT_MIN_RECORDS, snapshot_format='csv'):
+        self.snapshot_path = snapshot_path
+        self.wal_path = wal_path
+        self.snapshot_format = snapshot_format  # 快照格式与结果文件一致，列式格式可向量化加载
+        self.compact_threshold = compact_threshold
+        self._wal = None
+        self._wal_records = 0  # 当前追加日志中的记录数
+        self._snapshot_size = 0  # 上次快照中的记录数
+
+    @staticmethod
+    def _read_rows(path, has_header):
+        """读取CSV行；进程中断时写了一半的最后一行会被忽略并从文件中截掉"""
+        with open(path, 'r', newline='', encoding='utf-8') as f:
+            lines = f.readlines()
+        if lines and not lines[-1].endswith('\n'):
+            lines.pop()
+            with open(path, 'r+', encoding='utf-8') as f:
+                f.truncate(sum(len(line.encode('utf-8')) for line in lines))
+        reader = csv.reader(lines)
+        if has_header:
+            next(reader, None)
+        return [(row[0], row[1]) for row in reader if row and len(row) >= 2]
+
+    def load(self):
+        """加载快照并重放追加日志，返回{域名: 项目URL}；两个文件都不存在时返回None"""
+        items = {}
+        found = False
+        if os.path.exists(self.snapshot_path):
+            if detect_format(self.snapshot_path) == 'csv':
+                snapshot = dict(self._read_rows(self.snapshot_path, has_header=True))
+            else:
+                snapshot = load_domain_map(self.snapshot_path)
+            items.update(snapshot)
+            self._snapshot_size = len(snapshot)
+            found = True
+        if os.path.exists(self.wal_path):
+            rows = self._read_rows(self.wal_path, has_header=False)
+            items.update(rows)
+            self._wal_records = len(rows)
+            found = True
+        return items if found else None
+
+    def append(self, records):
+        """追加一批记录，写入后fsync一次"""
+        if not records:
+            return
+        if self._wal is None:
+            self._wal = open(self.wal_path, 'a', newline='', encoding='utf-8')
+        writer = csv.writer(self._wal)
+        writer.writerows(records)
+        self._wal.flush()
+        os.fsync(self._wal.fileno())
+        self._wal_records += len(records)
+
+    def needs_compaction(self):
+        """追加日志相对快照足够大时才压缩，使压缩的开销均摊到每条记录上为常数"""
+        return self._wal_records > max(self.compact_threshold, self._snapshot_size)
+
+    def compact(self, items):
+        """将当前全部记录写成新快照（原子替换），然后清空追加日志"""
+        temp_file = self.snapshot_path + '.new'
+        write_domains(items, temp_file, self.snapshot_format)
+        with open(temp_file, 'rb') as f:
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.snapshot_path)
+        self._snapshot_size = len(items)
+        self.close()
+        open(self.wal_path, 'w').close()
+        self._wal_records = 0
+
+    def close(self):
+        if self._wal is not None:
+            self._wal.close()
+            self._wal = None
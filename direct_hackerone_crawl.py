@@ -1,10 +1,11 @@
 import requests
 import time
-from bs4 import BeautifulSoup
 import re
 import json
 import csv
 import os
+from http_session import create_session
+from parser_backend import parse_html
 
 # 配置日志
 def log(message, level='INFO'):
@@ -25,6 +26,9 @@ headers = {
     'Upgrade-Insecure-Requests': '1'
 }
 
+# 复用keep-alive连接的HTTP会话
+session = create_session(headers=headers)
+
 def save_to_csv(domains, filename='hackerone_domains_direct.csv'):
     """将域名列表保存到CSV文件"""
     try:
@@ -45,17 +49,15 @@ def extract_domains_from_html(html, url):
         return {}
     
     domains = {}
-    soup = BeautifulSoup(html, 'html.parser')
+    doc = parse_html(html)
     
     # 检查是否需要JavaScript
     if 'js-disabled' in html and 'It looks like your JavaScript is disabled' in html:
         log("警告: 页面需要JavaScript才能正常显示内容", 'WARNING')
     
     # 方法1: 查找JSON数据
-    script_tags = soup.find_all('script', type='application/json')
-    for script in script_tags:
+    for script_content in doc.json_scripts():
         try:
-            script_content = script.string
             if script_content and ('opportunities' in script_content or 'programs' in script_content):
                 # 尝试解析JSON
                 try:
@@ -71,7 +73,7 @@ def extract_domains_from_html(html, url):
     
     # 方法2: 查找链接和域名模式
     # 查找所有可能的项目链接
-    program_links = soup.find_all('a', href=re.compile(r'/programs/'))
+    program_links = [href for href in doc.hrefs() if re.search(r'/programs/', href)]
     log(f"找到 {len(program_links)} 个可能的项目链接")
     
     # 提取域名模式
@@ -107,7 +109,7 @@ def crawl_hackerone():
     try:
         # 发送请求
         log(f"正在请求: {opportunities_url}")
-        response = requests.get(opportunities_url, headers=headers, timeout=30)
+        response = session.get(opportunities_url, timeout=30)
         response.raise_for_status()
         
         log(f"请求成功，状态码: {response.status_code}")
@@ -0,0 +1,214 @@
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# 缓存默认配置
+DEFAULT_MAX_AGE = 24 * 3600  # 缓存条目在此时间内直接使用，不发请求（秒）
+DEFAULT_MAX_SIZE = 512 * 1024 * 1024  # 缓存正文的总大小上限（字节），超出时按LRU淘汰
+TOUCH_BATCH_SIZE = 100  # 命中记录在内存中积累到此数量时写入索引
+
+INDEX_DB = 'index.sqlite'
+BODY_DIR = 'bodies'
+
+# 索引保存在SQLite中，多个进程共享同一缓存目录时由SQLite的锁保证一致
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    sha256 TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access);
+'''
+ENTRY_COLUMNS = ('url', 'etag', 'last_modified', 'sha256', 'size', 'fetched_at', 'last_access')
+
+
+def canonical_url(url):
+    """规范化URL作为缓存键：协议和主机小写、去掉片段、查询参数排序、去掉路径末尾的斜杠"""
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip('/') or '/'
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ''))
+
+
+def body_hash(body):
+    """计算响应正文的sha256，用于校验磁盘上的正文和判断内容是否变化"""
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """磁盘HTTP响应缓存：按规范化URL存储正文和ETag/Last-Modified，支持TTL、条件请求和LRU淘汰
+
+    索引保存在SQLite中，可以被多个进程同时使用；命中记录先在内存中积累，按批次写入索引
+    """
+    def __init__(self, cache_dir, max_age=DEFAULT_MAX_AGE, max_size=DEFAULT_MAX_SIZE, logger=None,
+                 touch_batch_size=TOUCH_BATCH_SIZE):
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.max_size = max_size
+        self.logger = logger
+        self.touch_batch_size = touch_batch_size
+        self._body_dir = os.path.join(cache_dir, BODY_DIR)
+        self._lock = threading.Lock()
+        os.makedirs(self._body_dir, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(cache_dir, INDEX_DB), timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        self._touched = {}  # 待写入的命中记录：键 -> (最近访问时间, 304确认时间或None)
+        self.hits = 0  # TTL内直接命中
+        self.revalidated = 0  # 条件请求返回304
+        self.misses = 0
+        with self._lock:
+            self._evict()  # 缓存大小上限可能比上次运行时小
+
+    def _body_path(self, key):
+        return os.path.join(self._body_dir, hashlib.sha256(key.encode('utf-8')).hexdigest() + '.html')
+
+    def _write_body(self, key, body):
+        """先写入唯一的临时文件再替换，多个进程同时写同一条目时不会互相破坏"""
+        path = self._body_path(key)
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=self._body_dir, suffix='.tmp',
+                                         delete=False) as f:
+            f.write(body)
+        os.replace(f.name, path)
+
+    def _drop(self, key):
+        """删除一个缓存条目及其正文文件，调用方需持有锁"""
+        self._touched.pop(key, None)
+        with self._conn:
+            self._conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+        try:
+            os.remove(self._body_path(key))
+        except FileNotFoundError:
+            pass
+
+    def _flush_touched(self):
+        """将积累的命中记录写入索引，调用方需持有锁"""
+        if not self._touched:
+            return
+        with self._conn:
+            self._conn.executemany(
+                '''UPDATE entries SET last_access = MAX(last_access, ?), fetched_at = MAX(fetched_at, COALESCE(?, fetched_at))
+                   WHERE key = ?''',
+                [(last_access, fetched_at, key) for key, (last_access, fetched_at) in self._touched.items()]
+            )
+        self._touched.clear()
+
+    def _evict(self):
+        """缓存总大小超过上限时，按最近访问时间从旧到新淘汰，调用方需持有锁"""
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_size:
+            return
+        self._flush_touched()
+        for key, size in self._conn.execute('SELECT key, size FROM entries ORDER BY last_access').fetchall():
+            if total <= self.max_size:
+                break
+            total -= size
+            self._drop(key)
+
+    def lookup(self, url):
+        """查找缓存条目，返回(条目, 正文)；不存在或正文校验失败时返回(None, None)"""
+        key = canonical_url(url)
+        with self._lock:
+            row = self._conn.execute(f'SELECT {", ".join(ENTRY_COLUMNS)} FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None, None
+            entry = dict(zip(ENTRY_COLUMNS, row))
+            touched = self._touched.get(key)
+            if touched and touched[1]:
+                entry['fetched_at'] = max(entry['fetched_at'], touched[1])
+            try:
+                with open(self._body_path(key), 'r', encoding='utf-8') as f:
+                    body = f.read()
+            except OSError:
+                body = None
+            if body is None or body_hash(body) != entry['sha256']:
+                self._drop(key)
+                return None, None
+            return entry, body
+
+    def is_fresh(self, entry):
+        """条目是否仍在TTL内，可以不发请求直接使用"""
+        return entry is not None and time.time() - entry['fetched_at'] < self.max_age
+
+    @staticmethod
+    def conditional_headers(entry):
+        """根据缓存条目生成条件请求头"""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def touch(self, url, mark_fetched=False):
+        """记录一次命中；mark_fetched为True表示服务器确认未修改（304），重新计算TTL
+
+        命中记录只在内存中标记，积累到touch_batch_size条或close()时才写入索引
+        """
+        key = canonical_url(url)
+        now = time.time()
+        with self._lock:
+            fetched_at = self._touched.get(key, (None, None))[1]
+            if mark_fetched:
+                fetched_at = now
+                self.revalidated += 1
+            else:
+                self.hits += 1
+            self._touched[key] = (now, fetched_at)
+            if len(self._touched) >= self.touch_batch_size:
+                self._flush_touched()
+
+    def store(self, url, body, headers=None):
+        """保存响应正文和校验信息，返回正文是否与之前缓存的不同"""
+        key = canonical_url(url)
+        headers = headers or {}
+        digest = body_hash(body)
+        now = time.time()
+        with self._lock:
+            self.misses += 1
+            self._touched.pop(key, None)
+            previous = self._conn.execute('SELECT sha256 FROM entries WHERE key = ?', (key,)).fetchone()
+            changed = previous is None or previous[0] != digest
+            if changed:
+                self._write_body(key, body)
+            with self._conn:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (key, url, headers.get('ETag'), headers.get('Last-Modified'), digest,
+                     len(body.encode('utf-8')), now, now)
+                )
+            self._evict()
+            return changed
+
+    def flush(self):
+        """将内存中的命中记录写入索引"""
+        with self._lock:
+            self._flush_touched()
+
+    def stats(self):
+        """缓存统计信息"""
+        with self._lock:
+            entries, size = self._conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+            return {
+                'entries': entries,
+                'size': size,
+                'hits': self.hits,
+                'revalidated': self.revalidated,
+                'misses': self.misses,
+            }
+
+    def close(self):
+        with self._lock:
+            self._flush_touched()
+            self._conn.close()
@@ -0,0 +1,89 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 连接池默认配置
+DEFAULT_POOL_SIZE = 10  # 每个主机保持的keep-alive连接数
+DEFAULT_RETRIES = 3  # 适配器层面的自动重试次数
+DEFAULT_BACKOFF_FACTOR = 0.3  # 重试退避因子
+
+# 需要自动重试的HTTP状态码
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+def create_session(pool_size=DEFAULT_POOL_SIZE, retries=DEFAULT_RETRIES, backoff_factor=DEFAULT_BACKOFF_FACTOR,
+                   headers=None, proxy=None):
+    """创建挂载了连接池和重试策略的requests会话"""
+    session = requests.Session()
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        raise_on_status=False  # 由调用方通过raise_for_status处理最终状态
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    if headers:
+        session.headers.update(headers)
+    if proxy:
+        session.proxies.update(proxy)
+    return session
+
+
+class SessionPool:
+    """按代理划分的HTTP会话池，每个代理复用一组keep-alive连接"""
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, retries=DEFAULT_RETRIES, backoff_factor=DEFAULT_BACKOFF_FACTOR,
+                 headers=None):
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.headers = dict(headers) if headers else {}
+        self._sessions = {}
+        self._cookies = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _proxy_key(proxy):
+        """代理字典转换为可哈希的键，None表示直连"""
+        if not proxy:
+            return None
+        return tuple(sorted(proxy.items()))
+
+    @staticmethod
+    def _apply_cookies(session, cookies):
+        """将Playwright格式的Cookie写入会话的CookieJar"""
+        for cookie in cookies:
+            session.cookies.set(
+                cookie['name'],
+                cookie['value'],
+                domain=cookie.get('domain', ''),
+                path=cookie.get('path', '/')
+            )
+
+    def get(self, proxy=None):
+        """获取指定代理对应的会话，不存在时创建"""
+        key = self._proxy_key(proxy)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = create_session(self.pool_size, self.retries, self.backoff_factor,
+                                         headers=self.headers, proxy=proxy)
+                self._apply_cookies(session, self._cookies)
+                self._sessions[key] = session
+            return session
+
+    def load_cookies(self, cookies):
+        """加载登录Cookie，已创建和之后创建的会话都会使用这些Cookie"""
+        with self._lock:
+            self._cookies = list(cookies or [])
+            for session in self._sessions.values():
+                self._apply_cookies(session, self._cookies)
+
+    def close(self):
+        """关闭所有会话及其连接池"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
@@ -0,0 +1,106 @@
+from urllib.parse import urlsplit
+
+# 精简渲染模式默认拦截的资源类型（Playwright的resource_type名称）
+DEFAULT_BLOCKED_RESOURCE_TYPES = ('image', 'media', 'font')
+RESOURCE_TYPES = ('image', 'media', 'font', 'stylesheet')
+
+# 默认拦截的第三方统计、广告和监控域名（包括其子域名）
+DEFAULT_BLOCKED_HOSTS = (
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'facebook.net',
+    'segment.com',
+    'segment.io',
+    'hotjar.com',
+    'intercom.io',
+    'heapanalytics.com',
+    'optimizely.com',
+    'nr-data.net',
+    'sentry.io',
+)
+
+# Selenium没有按资源类型拦截的接口，通过CDP按扩展名拦截
+RESOURCE_TYPE_PATTERNS = {
+    'image': ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico', '*.avif'],
+    'media': ['*.mp4', '*.webm', '*.ogg', '*.mp3', '*.m4a'],
+    'font': ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot'],
+    'stylesheet': ['*.css'],
+}
+
+# Chrome内容设置：2表示禁止加载
+CHROME_CONTENT_SETTINGS = {
+    'image': 'profile.managed_default_content_settings.images',
+    'stylesheet': 'profile.managed_default_content_settings.stylesheets',
+}
+
+
+def parse_list(value):
+    """解析逗号分隔的列表参数，忽略空项"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    return [item.strip().lower() for item in value if item and item.strip()]
+
+
+class LeanProfile:
+    """精简渲染配置：拦截指定类型的资源和第三方域名，页面加载只等待DOM就绪"""
+    def __init__(self, resource_types=None, blocked_hosts=None):
+        resource_types = parse_list(resource_types) if resource_types is not None else list(DEFAULT_BLOCKED_RESOURCE_TYPES)
+        unknown = [resource_type for resource_type in resource_types if resource_type not in RESOURCE_TYPES]
+        if unknown:
+            raise ValueError(f"不支持拦截的资源类型: {', '.join(unknown)}，可选: {', '.join(RESOURCE_TYPES)}")
+        self.resource_types = frozenset(resource_types)
+        self.blocked_hosts = tuple(dict.fromkeys(list(DEFAULT_BLOCKED_HOSTS) + parse_list(blocked_hosts)))
+        self.blocked_count = 0  # Playwright拦截的请求数，Selenium由浏览器直接拦截，不计入
+        # Playwright导航等待DOMContentLoaded即可，内容是否渲染完成由页面就绪判定负责
+        self.wait_until = 'domcontentloaded'
+
+    def is_blocked_host(self, url):
+        host = (urlsplit(url).hostname or '').lower()
+        return any(host == blocked or host.endswith('.' + blocked) for blocked in self.blocked_hosts)
+
+    def should_block(self, resource_type, url):
+        """请求是否应被拦截"""
+        return resource_type in self.resource_types or self.is_blocked_host(url)
+
+    def _handle_route(self, route):
+        request = route.request
+        if self.should_block(request.resource_type, request.url):
+            self.blocked_count += 1
+            return route.abort()
+        return route.continue_()
+
+    def install_playwright(self, context):
+        """为同步Playwright的浏览器上下文安装请求拦截"""
+        context.route('**/*', self._handle_route)
+
+    async def install_playwright_async(self, context):
+        """为异步Playwright的浏览器上下文安装请求拦截"""
+        async def handle(route):
+            await self._handle_route(route)
+        await context.route('**/*', handle)
+
+    def blocked_url_patterns(self):
+        """CDP Network.setBlockedURLs使用的URL模式"""
+        patterns = [pattern for resource_type in sorted(self.resource_types)
+                    for pattern in RESOURCE_TYPE_PATTERNS[resource_type]]
+        for host in self.blocked_hosts:
+            patterns.extend([f'*://{host}/*', f'*://*.{host}/*'])
+        return patterns
+
+    def apply_chrome_options(self, chrome_options):
+        """为Selenium的Chrome选项设置内容拦截偏好和eager页面加载策略"""
+        prefs = {pref: 2 for resource_type, pref in CHROME_CONTENT_SETTINGS.items() if resource_type in self.resource_types}
+        if prefs:
+            chrome_options.add_experimental_option('prefs', prefs)
+        if 'image' in self.resource_types:
+            chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+        # DOMContentLoaded后即返回，内容是否渲染完成由页面就绪判定负责
+        chrome_options.page_load_strategy = 'eager'
+
+    def install_selenium(self, driver):
+        """通过CDP为已启动的Chrome拦截资源和第三方域名"""
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_url_patterns()})
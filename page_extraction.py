@@ -0,0 +1,75 @@
+import json
+
+from page_readiness import PROGRAM_CARD_SELECTORS
+from parser_backend import SCOPE_SECTION_CLASS, TARGET_DOMAINS_QA, ScopeCandidates
+from response_capture import CapturedPage
+
+# 在页面中提取解析所需的最少数据，与parse_program_details/parse_programs_page使用相同的定位条件：
+# target-domains区域和备用类名区域中的code文本、所有code文本、项目卡片中的链接，
+# 以及内嵌JSON中的范围(targets)和项目列表(programs)部分
+EXTRACT_FUNCTION = '''([targetQa, scopeClass, cardSelectors, includeLinks]) => {
+    const texts = nodes => Array.from(nodes, node => node.textContent.trim());
+    const firstCodes = selector => {
+        const section = document.querySelector(selector);
+        return section ? texts(section.querySelectorAll('code')) : null;
+    };
+    const pageData = [];
+    for (const script of document.querySelectorAll('script[type="application/json"]')) {
+        let data;
+        try {
+            data = JSON.parse(script.textContent);
+        } catch (e) {
+            continue;
+        }
+        const pageProps = data && data.props && data.props.pageProps;
+        if (pageProps && pageProps.program && pageProps.program.targets) {
+            pageData.push({props: {pageProps: {program: {targets: pageProps.program.targets}}}});
+        }
+        if (pageProps && pageProps.programs) {
+            pageData.push({props: {pageProps: {programs: pageProps.programs}}});
+        } else if (data && data.programs) {
+            pageData.push({programs: data.programs});
+        }
+    }
+    let hrefs = [];
+    if (includeLinks) {
+        // 有项目卡片时只取卡片中的链接，否则取页面中所有链接
+        const cards = Array.from(document.querySelectorAll(cardSelectors.join(',')));
+        const anchors = cards.length
+            ? cards.flatMap(card => card.matches('a[href]') ? [card] : Array.from(card.querySelectorAll('a[href]')))
+            : Array.from(document.querySelectorAll('a[href]'));
+        hrefs = anchors.map(anchor => anchor.getAttribute('href'));
+    }
+    return {
+        target_domains: firstCodes(`div[data-qa="${targetQa}"]`),
+        scope_section: firstCodes(`div.${scopeClass}`),
+        codes: texts(document.querySelectorAll('code')),
+        hrefs: hrefs,
+        page_data: pageData,
+    };
+}'''
+
+
+def extract_args(include_links):
+    """EXTRACT_FUNCTION的参数"""
+    return [TARGET_DOMAINS_QA, SCOPE_SECTION_CLASS, PROGRAM_CARD_SELECTORS, include_links]
+
+
+class ExtractedPage(CapturedPage):
+    """在页面中提取出的数据：内嵌JSON部分作为payloads，DOM部分作为范围候选来源和链接"""
+    def __new__(cls, result):
+        page = str.__new__(cls, json.dumps(result, ensure_ascii=False))
+        page.payloads = result.get('page_data') or []
+        page.hrefs = [href for href in result.get('hrefs') or [] if href]
+        candidates = ScopeCandidates()
+        candidates.target_domains = result.get('target_domains')
+        candidates.scope_section = result.get('scope_section')
+        candidates.codes = result.get('codes') or []
+        page.candidates = candidates
+        return page
+
+    @staticmethod
+    def is_empty(result):
+        """提取结果中是否没有任何可用数据"""
+        return not result or not any(result.get(key) for key in
+                                     ('target_domains', 'scope_section', 'codes', 'hrefs', 'page_data'))
@@ -0,0 +1,141 @@
+from parser_backend import SCOPE_SECTION_CLASS, TARGET_DOMAINS_QA
+
+# 默认就绪判定参数
+DEFAULT_QUIET_MS = 500  # DOM连续这么久没有变化视为渲染完成（毫秒）
+DEFAULT_READY_TIMEOUT = 15  # 就绪等待的硬超时（秒），超时后直接使用当前页面内容
+STABLE_SCROLLS = 2  # 列表页连续这么多次滚动都没有出现新链接时停止滚动
+MAX_SCROLLS = 200  # 列表页最多滚动次数
+
+# 项目列表页中的项目卡片
+PROGRAM_CARD_SELECTORS = [
+    '[data-testid="program-card"]',
+    '.program-card',
+    '.application-card',
+]
+
+# 项目列表页：出现项目卡片或内嵌的页面数据即可解析
+LISTING_READY_SELECTORS = PROGRAM_CARD_SELECTORS + ['script#__NEXT_DATA__']
+
+# 项目详情页：出现范围区域或内嵌的页面数据即可解析
+PROGRAM_READY_SELECTORS = [
+    f'div[data-qa="{TARGET_DOMAINS_QA}"]',
+    f'div.{SCOPE_SECTION_CLASS}',
+    'script#__NEXT_DATA__',
+]
+
+# 在页面中等待：任一选择器匹配且DOM在quietMs内没有变化时返回，超过timeoutMs时无论如何返回
+WAIT_READY_FUNCTION = '''async ([selectors, quietMs, timeoutMs]) => {
+    const start = performance.now();
+    const matched = () => selectors.find(selector => document.querySelector(selector)) || null;
+    return await new Promise(resolve => {
+        let quietTimer = null;
+        let hardTimer = null;
+        const observer = new MutationObserver(() => arm());
+        const finish = ready => {
+            observer.disconnect();
+            clearTimeout(quietTimer);
+            clearTimeout(hardTimer);
+            resolve({ready: ready, selector: matched(), elapsed: performance.now() - start});
+        };
+        const arm = () => {
+            clearTimeout(quietTimer);
+            quietTimer = setTimeout(() => {
+                if (matched()) {
+                    finish(true);
+                }
+            }, quietMs);
+        };
+        observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+        hardTimer = setTimeout(() => finish(false), timeoutMs);
+        arm();
+    });
+}'''
+
+# Selenium的execute_async_script通过最后一个参数回调返回结果
+SELENIUM_WAIT_READY_SCRIPT = f'''const done = arguments[arguments.length - 1];
+({WAIT_READY_FUNCTION})([arguments[0], arguments[1], arguments[2]]).then(done, () => done(null));'''
+
+
+# 页面中所有链接的href，用于发现滚动后新出现的项目卡片
+PAGE_HREFS_FUNCTION = "() => Array.from(document.querySelectorAll('a[href]'), a => a.getAttribute('href'))"
+SCROLL_FUNCTION = '() => window.scrollTo(0, document.body.scrollHeight)'
+
+
+def is_listing_url(url):
+    """是否为项目列表页"""
+    return 'opportunities/all' in url or 'bug-bounty-programs' in url
+
+
+def ready_selectors(url):
+    """根据URL选择判定就绪的选择器"""
+    if is_listing_url(url):
+        return LISTING_READY_SELECTORS
+    return PROGRAM_READY_SELECTORS
+
+
+def _new_hrefs(hrefs, seen):
+    """按出现顺序返回未见过的链接并记入seen"""
+    new = [href for href in dict.fromkeys(hrefs or []) if href not in seen]
+    seen.update(new)
+    return new
+
+
+def scroll_until_stable(evaluate, wait_ready, stable_scrolls=STABLE_SCROLLS, max_scrolls=MAX_SCROLLS):
+    """滚动加载列表页，每次产出新出现的链接，链接连续stable_scrolls次不再增加时停止
+
+    evaluate(script)在页面中执行JS函数并返回结果，wait_ready()等待滚动触发的渲染完成
+    """
+    seen = set()
+    stable = 0
+    for scrolls in range(max_scrolls + 1):
+        new = _new_hrefs(evaluate(PAGE_HREFS_FUNCTION), seen)
+        if new:
+            stable = 0
+            yield new
+        else:
+            stable += 1
+            if stable >= stable_scrolls:
+                return
+        if scrolls < max_scrolls:
+            evaluate(SCROLL_FUNCTION)
+            wait_ready()
+
+
+async def scroll_until_stable_async(evaluate, wait_ready, stable_scrolls=STABLE_SCROLLS, max_scrolls=MAX_SCROLLS):
+    """scroll_until_stable的异步版本，evaluate和wait_ready为协程函数"""
+    seen = set()
+    stable = 0
+    for scrolls in range(max_scrolls + 1):
+        new = _new_hrefs(await evaluate(PAGE_HREFS_FUNCTION), seen)
+        if new:
+            stable = 0
+            yield new
+        else:
+            stable += 1
+            if stable >= stable_scrolls:
+                return
+        if scrolls < max_scrolls:
+            await evaluate(SCROLL_FUNCTION)
+            await wait_ready()
+
+
+def wait_ready_playwright(page, selectors, quiet_ms=DEFAULT_QUIET_MS, timeout=DEFAULT_READY_TIMEOUT):
+    """等待Playwright页面就绪，返回{'ready', 'selector', 'elapsed'}"""
+    return page.evaluate(WAIT_READY_FUNCTION, [selectors, quiet_ms, int(timeout * 1000)])
+
+
+async def wait_ready_playwright_async(page, selectors, quiet_ms=DEFAULT_QUIET_MS, timeout=DEFAULT_READY_TIMEOUT):
+    """等待异步Playwright页面就绪，返回{'ready', 'selector', 'elapsed'}"""
+    return await page.evaluate(WAIT_READY_FUNCTION, [selectors, quiet_ms, int(timeout * 1000)])
+
+
+def wait_ready_selenium(driver, selectors, quiet_ms=DEFAULT_QUIET_MS, timeout=DEFAULT_READY_TIMEOUT):
+    """等待Selenium页面就绪，返回{'ready', 'selector', 'elapsed'}，脚本执行失败时返回None"""
+    # 脚本超时要比页面内的硬超时略长，确保总能拿到页面内的结果
+    driver.set_script_timeout(timeout + 5)
+    return driver.execute_async_script(SELENIUM_WAIT_READY_SCRIPT, selectors, quiet_ms, int(timeout * 1000))
+
+
+def selenium_evaluate(driver, script, arg=None):
+    """在Selenium页面中执行JS函数（与Playwright的page.evaluate用法一致）"""
+    return driver.execute_script(f'return ({script})(arguments[0]);', arg)
@@ -0,0 +1,551 @@
+import hashlib
+import json
+import logging
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+# 尝试导入更快的解析引擎（可选）
+selectolax_available = False
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    selectolax_available = True
+except ImportError:
+    LexborHTMLParser = None
+
+lxml_available = False
+try:
+    import lxml.html
+    import lxml.etree
+    lxml_available = True
+except ImportError:
+    pass
+
+# 可选的解析引擎，auto按速度从快到慢选择第一个可用的引擎
+PARSER_ENGINES = ['auto', 'selectolax', 'lxml', 'html.parser']
+
+
+def available_engines():
+    """返回当前环境中可用的解析引擎"""
+    engines = []
+    if selectolax_available:
+        engines.append('selectolax')
+    if lxml_available:
+        engines.append('lxml')
+    engines.append('html.parser')  # 纯Python实现，始终可用
+    return engines
+
+
+def resolve_engine(engine='auto'):
+    """将引擎名称解析为实际可用的引擎，不可用时回退到html.parser"""
+    engines = available_engines()
+    if not engine or engine == 'auto':
+        return engines[0]
+    if engine not in engines:
+        logger.warning(f"解析引擎 {engine} 不可用，回退到 {engines[0]}")
+        return engines[0]
+    return engine
+
+
+# 项目详情页中域名所在区域的定位条件
+TARGET_DOMAINS_QA = 'target-domains'
+SCOPE_SECTION_CLASS = 'program-scope__target-domains'
+
+
+def is_domain_like(text):
+    """简单判断code标签文本是否为域名"""
+    return '.' in text and len(text) > 3 and not text.startswith('<') and not text.endswith('>')
+
+
+def iter_json_payloads(html):
+    """直接从原始HTML（str或bytes）中定位并解码type=application/json的script，无法解码的跳过"""
+    if not html:
+        return
+    # 只做子串查找，不构建DOM也不使用正则回溯，大页面上也只需亚毫秒级时间
+    if isinstance(html, bytes):
+        marker, script_open, script_close, tag_end = b'application/json', b'<script', b'</script', b'>'
+    else:
+        marker, script_open, script_close, tag_end = 'application/json', '<script', '</script', '>'
+    pos = 0
+    while True:
+        index = html.find(marker, pos)
+        if index < 0:
+            return
+        pos = index + len(marker)
+        # 标记必须位于<script ...>开始标签之内
+        tag_start = html.rfind(script_open, 0, index)
+        if tag_start < 0 or html.find(tag_end, tag_start, index) >= 0:
+            continue
+        content_start = html.find(tag_end, index)
+        content_end = html.find(script_close, content_start)
+        if content_start < 0 or content_end < 0:
+            return
+        pos = content_end
+        try:
+            yield json.loads(html[content_start + 1:content_end])
+        except ValueError:
+            continue
+
+
+def program_listing_from_json(json_data):
+    """从JSON数据中提取(项目链接, 更新时间)列表，数据中没有项目列表时返回None"""
+    programs = None
+    if 'props' in json_data and 'pageProps' in json_data['props'] and 'programs' in json_data['props']['pageProps']:
+        programs = json_data['props']['pageProps']['programs']
+    elif 'programs' in json_data:
+        # 尝试其他可能的JSON结构
+        programs = json_data['programs']
+    if programs is None:
+        return None
+
+    listing = []
+    for program in programs:
+        updated_at = program.get('last_updated_at') or program.get('updated_at')
+        if 'url' in program:
+            listing.append((program['url'], updated_at))
+        elif 'slug' in program:
+            listing.append((f"https://hackerone.com/{program['slug']}", updated_at))
+    return listing
+
+
+def fast_program_listing(html):
+    """快速路径：不构建DOM，直接从内嵌JSON中提取(项目链接, 更新时间)列表，没有可用数据时返回None"""
+    for json_data in iter_json_payloads(html):
+        try:
+            listing = program_listing_from_json(json_data)
+        except Exception:
+            continue
+        if listing is not None:
+            return listing
+    return None
+
+
+# 列表数据中可能表示项目总数和总页数的字段
+LISTING_TOTAL_KEYS = ('total_count', 'totalCount', 'total')
+LISTING_PAGE_COUNT_KEYS = ('total_pages', 'totalPages', 'page_count', 'pageCount')
+
+
+def _first_int(container, keys):
+    for key in keys:
+        value = container.get(key)
+        if isinstance(value, int) and not isinstance(value, bool) and value >= 0:
+            return value
+    return None
+
+
+def listing_totals_from_json(json_data):
+    """从列表数据中提取(项目总数, 总页数)，没有的字段为None"""
+    if not isinstance(json_data, dict):
+        return None, None
+    _, api_total = programs_from_api(json_data)
+    if api_total is not None:
+        return api_total, None
+    page_props = (json_data.get('props') or {}).get('pageProps') if isinstance(json_data.get('props'), dict) else None
+    containers = [json_data, json_data.get('pagination'), json_data.get('meta')]
+    if isinstance(page_props, dict):
+        containers[:0] = [page_props, page_props.get('pagination'), page_props.get('meta')]
+    total = pages = None
+    for container in containers:
+        if isinstance(container, dict):
+            total = total if total is not None else _first_int(container, LISTING_TOTAL_KEYS)
+            pages = pages if pages is not None else _first_int(container, LISTING_PAGE_COUNT_KEYS)
+    return total, pages
+
+
+def listing_totals(payloads):
+    """从一组JSON数据中提取第一个可用的(项目总数, 总页数)"""
+    for json_data in payloads:
+        try:
+            total, pages = listing_totals_from_json(_as_page_data(json_data))
+        except Exception:
+            continue
+        if total is not None or pages is not None:
+            return total, pages
+    return None, None
+
+
+def fast_listing_totals(html):
+    """快速路径：不构建DOM，从内嵌JSON中提取(项目总数, 总页数)"""
+    return listing_totals(iter_json_payloads(html))
+
+
+def fast_scope_domains(html):
+    """快速路径：不构建DOM，直接从内嵌JSON中提取in_scope域名"""
+    domains = []
+    for json_data in iter_json_payloads(html):
+        try:
+            domains.extend(scope_from_json(json_data))
+        except Exception:
+            continue
+    return domains
+
+
+def scope_targets_from_json(json_data):
+    """取出Next.js页面数据中的targets（范围数据），没有时返回None"""
+    if 'props' in json_data and 'pageProps' in json_data['props']:
+        page_props = json_data['props']['pageProps']
+        if 'program' in page_props and 'targets' in page_props['program']:
+            return page_props['program']['targets']
+    return None
+
+
+def scope_from_json(json_data):
+    """从Next.js页面数据中提取in_scope目标的域名"""
+    domains = []
+    targets = scope_targets_from_json(json_data)
+    if targets and 'in_scope' in targets:
+        for target in targets['in_scope']:
+            if 'asset_identifier' in target:
+                domain = target['asset_identifier']
+                if '.' in domain:
+                    domains.append(domain)
+    return domains
+
+
+def content_fingerprint(data):
+    """计算可JSON序列化数据的规范化指纹（键排序、紧凑格式后的sha256）"""
+    normalized = json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def domains_fingerprint(domains):
+    """域名列表的指纹，与顺序和重复无关"""
+    return content_fingerprint(sorted(set(domains)))
+
+
+def link_set_fingerprint(links):
+    """列表页项目链接集合的指纹，与顺序和重复无关，用于发现重复返回的页面"""
+    return content_fingerprint(sorted(set(links)))
+
+
+def fast_scope_fingerprint(html):
+    """快速路径：不构建DOM，计算内嵌JSON中范围数据的指纹，页面没有范围数据时返回None"""
+    for json_data in iter_json_payloads(html):
+        try:
+            targets = scope_targets_from_json(json_data)
+        except Exception:
+            continue
+        if targets is not None:
+            return content_fingerprint(targets)
+    return None
+
+
+def _graphql_search_nodes(data, *path):
+    """沿路径取出GraphQL搜索结果中的nodes和total_count，结构不符时返回([], None)"""
+    result = data.get('data') if isinstance(data, dict) else None
+    for key in path:
+        if not isinstance(result, dict):
+            return [], None
+        result = result.get(key)
+    if not isinstance(result, dict):
+        return [], None
+    return result.get('nodes') or [], result.get('total_count')
+
+
+# 范围资产中表示域名的资产类型
+API_DOMAIN_ASSET_TYPES = ('URL', 'WILDCARD')
+
+
+def programs_from_api(data):
+    """从opportunities_search的GraphQL响应中提取(handle, 更新时间)列表和项目总数"""
+    nodes, total_count = _graphql_search_nodes(data, 'opportunities_search')
+    programs = []
+    for node in nodes:
+        if isinstance(node, dict) and node.get('handle'):
+            programs.append((node['handle'], node.get('last_updated_at')))
+    return programs, total_count
+
+
+def scope_from_api(data):
+    """从structured_scopes_search的GraphQL响应中提取可提交的域名、本页节点数和范围总数"""
+    nodes, total_count = _graphql_search_nodes(data, 'team', 'structured_scopes_search')
+    domains = []
+    for node in nodes:
+        if not isinstance(node, dict) or node.get('eligible_for_submission') is False:
+            continue
+        # 只保留域名类资产，应用包名、源码等其他类型跳过
+        if node.get('asset_type') and node['asset_type'] not in API_DOMAIN_ASSET_TYPES:
+            continue
+        identifier = node.get('identifier') or node.get('asset_identifier')
+        if isinstance(identifier, str) and '.' in identifier:
+            domains.append(identifier)
+    return domains, len(nodes), total_count
+
+
+def _as_page_data(data):
+    """Next.js客户端导航的/_next/data响应没有props外层，补齐后与页面内嵌数据结构一致"""
+    if isinstance(data, dict) and 'pageProps' in data and 'props' not in data:
+        return {'props': data}
+    return data
+
+
+def _api_scope_nodes(data):
+    return _graphql_search_nodes(data, 'team', 'structured_scopes_search')[0]
+
+
+def payload_kind(data):
+    """判断浏览器捕获的JSON响应中的数据：'scope'（项目范围）、'listing'（项目列表）或None"""
+    data = _as_page_data(data)
+    if not isinstance(data, dict):
+        return None
+    try:
+        if scope_targets_from_json(data) is not None or _api_scope_nodes(data):
+            return 'scope'
+        if program_listing_from_json(data) is not None or programs_from_api(data)[0]:
+            return 'listing'
+    except Exception:
+        pass
+    return None
+
+
+def listing_from_payloads(payloads, base_url):
+    """从捕获的JSON响应中提取(项目链接, 更新时间)列表，没有项目列表数据时返回None"""
+    listing = None
+    for data in payloads:
+        if payload_kind(data) != 'listing':
+            continue
+        data = _as_page_data(data)
+        programs, _ = programs_from_api(data)
+        listing = listing or []
+        if programs:
+            listing.extend((f'{base_url}/{handle}', updated_at) for handle, updated_at in programs)
+        else:
+            listing.extend(program_listing_from_json(data))
+    return listing
+
+
+def scope_from_payloads(payloads):
+    """从捕获的JSON响应中提取(域名列表, 范围数据指纹)，没有范围数据时返回None"""
+    domains = []
+    scope_data = []
+    for data in payloads:
+        if payload_kind(data) != 'scope':
+            continue
+        data = _as_page_data(data)
+        targets = scope_targets_from_json(data)
+        if targets is not None:
+            scope_data.append(targets)
+            domains.extend(scope_from_json(data))
+        else:
+            scope_data.append(_api_scope_nodes(data))
+            domains.extend(scope_from_api(data)[0])
+    if not scope_data:
+        return None
+    # 只有一份范围数据时与页面内嵌数据的指纹一致，切换抓取方式不会被当作范围变化
+    return domains, content_fingerprint(scope_data[0] if len(scope_data) == 1 else scope_data)
+
+
+class ScopeCandidates:
+    """一次遍历文档收集到的所有候选域名来源"""
+    def __init__(self):
+        self.target_domains = None  # 第一个data-qa='target-domains'的div中的code文本
+        self.scope_section = None  # 第一个program-scope__target-domains类的div中的code文本
+        self.codes = []  # 页面中所有code标签的文本
+        self.json_scripts = []  # 所有type=application/json的script内容（按需解码）
+
+
+def resolve_scope(candidates, use_json=True):
+    """按原有优先级从候选来源中确定域名列表：target-domains、备用类名、所有code标签、JSON数据"""
+    for texts in (candidates.target_domains, candidates.scope_section):
+        domains = [text for text in texts or [] if text]
+        if domains:
+            return domains
+
+    domains = [text for text in candidates.codes if is_domain_like(text)]
+    if domains or not use_json:
+        return domains
+
+    for script_text in candidates.json_scripts:
+        try:
+            domains.extend(scope_from_json(json.loads(script_text)))
+        except Exception:
+            continue
+    return domains
+
+
+def _has_class(class_attr, class_name):
+    return class_name in (class_attr or '').split()
+
+
+class BeautifulSoupDocument:
+    """基于BeautifulSoup的文档（纯Python回退实现）"""
+    def __init__(self, html):
+        self.soup = BeautifulSoup(html, 'html.parser')
+
+    def json_scripts(self):
+        """所有type=application/json的script标签内容"""
+        return [script.string for script in self.soup.find_all('script', type='application/json')]
+
+    def first_div_codes(self, data_qa=None, class_name=None):
+        """第一个匹配div中的code文本，div不存在时返回None"""
+        if data_qa:
+            section = self.soup.find('div', {'data-qa': data_qa})
+        else:
+            section = self.soup.find('div', class_=class_name)
+        if not section:
+            return None
+        return [code.get_text(strip=True) for code in section.find_all('code')]
+
+    def code_texts(self):
+        """页面中所有code标签的文本"""
+        return [code.get_text(strip=True) for code in self.soup.find_all('code')]
+
+    def hrefs(self):
+        """页面中所有a标签的href属性"""
+        return [link['href'] for link in self.soup.find_all('a', href=True)]
+
+    def scope_candidates(self):
+        """一次遍历收集域名的所有候选来源"""
+        candidates = ScopeCandidates()
+        target_section = scope_section = None
+        for element in self.soup.find_all(['div', 'code', 'script']):
+            if element.name == 'div':
+                if target_section is None and element.get('data-qa') == TARGET_DOMAINS_QA:
+                    target_section = element
+                    candidates.target_domains = []
+                if scope_section is None and SCOPE_SECTION_CLASS in element.get('class', []):
+                    scope_section = element
+                    candidates.scope_section = []
+            elif element.name == 'code':
+                text = element.get_text(strip=True)
+                candidates.codes.append(text)
+                for parent in element.parents:
+                    if parent is target_section:
+                        candidates.target_domains.append(text)
+                    if parent is scope_section:
+                        candidates.scope_section.append(text)
+            elif element.get('type') == 'application/json':
+                candidates.json_scripts.append(element.string)
+        return candidates
+
+
+class LxmlDocument:
+    """基于lxml的文档"""
+    def __init__(self, html):
+        if isinstance(html, str):
+            # lxml不接受带编码声明的str，统一转为utf-8字节
+            html = html.encode('utf-8')
+        parser = lxml.html.HTMLParser(encoding='utf-8')
+        try:
+            self.root = lxml.html.document_fromstring(html, parser=parser)
+        except (lxml.etree.ParserError, ValueError):
+            self.root = lxml.html.document_fromstring(b'<html></html>', parser=parser)
+
+    @staticmethod
+    def _text(element):
+        # 与BeautifulSoup的get_text(strip=True)一致：逐段去除空白后拼接
+        return ''.join(text.strip() for text in element.itertext())
+
+    def json_scripts(self):
+        return [script.text for script in self.root.xpath("//script[@type='application/json']")]
+
+    def first_div_codes(self, data_qa=None, class_name=None):
+        if data_qa:
+            sections = self.root.xpath("//div[@data-qa=$value]", value=data_qa)
+        else:
+            sections = self.root.xpath(
+                "//div[contains(concat(' ', normalize-space(@class), ' '), concat(' ', $value, ' '))]",
+                value=class_name
+            )
+        if not sections:
+            return None
+        return [self._text(code) for code in sections[0].iter('code')]
+
+    def code_texts(self):
+        return [self._text(code) for code in self.root.iter('code')]
+
+    def hrefs(self):
+        return self.root.xpath('//a/@href')
+
+    def scope_candidates(self):
+        candidates = ScopeCandidates()
+        target_section = scope_section = None
+        for element in self.root.iter('div', 'code', 'script'):
+            if element.tag == 'div':
+                if target_section is None and element.get('data-qa') == TARGET_DOMAINS_QA:
+                    target_section = element
+                    candidates.target_domains = []
+                if scope_section is None and _has_class(element.get('class'), SCOPE_SECTION_CLASS):
+                    scope_section = element
+                    candidates.scope_section = []
+            elif element.tag == 'code':
+                text = self._text(element)
+                candidates.codes.append(text)
+                for parent in element.iterancestors():
+                    if parent is target_section:
+                        candidates.target_domains.append(text)
+                    if parent is scope_section:
+                        candidates.scope_section.append(text)
+            elif element.get('type') == 'application/json':
+                candidates.json_scripts.append(element.text)
+        return candidates
+
+
+class SelectolaxDocument:
+    """基于selectolax（Lexbor）的文档"""
+    def __init__(self, html):
+        self.tree = LexborHTMLParser(html)
+
+    @staticmethod
+    def _text(node):
+        return node.text(deep=True, separator='', strip=True)
+
+    @staticmethod
+    def _script_text(node):
+        # 与BeautifulSoup的script.string一致：空script返回None
+        return node.text(deep=True) or None
+
+    def json_scripts(self):
+        return [self._script_text(script) for script in self.tree.css('script[type="application/json"]')]
+
+    def first_div_codes(self, data_qa=None, class_name=None):
+        if data_qa:
+            section = self.tree.css_first(f'div[data-qa="{data_qa}"]')
+        else:
+            section = self.tree.css_first(f'div.{class_name}')
+        if section is None:
+            return None
+        return [self._text(code) for code in section.css('code')]
+
+    def code_texts(self):
+        return [self._text(code) for code in self.tree.css('code')]
+
+    def hrefs(self):
+        return [link.attributes.get('href') or '' for link in self.tree.css('a[href]')]
+
+    def scope_candidates(self):
+        candidates = ScopeCandidates()
+        target_id = scope_id = None
+        for node in self.tree.css('div, code, script'):
+            if node.tag == 'div':
+                if target_id is None and node.attributes.get('data-qa') == TARGET_DOMAINS_QA:
+                    target_id = node.mem_id
+                    candidates.target_domains = []
+                if scope_id is None and _has_class(node.attributes.get('class'), SCOPE_SECTION_CLASS):
+                    scope_id = node.mem_id
+                    candidates.scope_section = []
+            elif node.tag == 'code':
+                text = self._text(node)
+                candidates.codes.append(text)
+                parent = node.parent
+                while parent is not None:
+                    if parent.mem_id == target_id:
+                        candidates.target_domains.append(text)
+                    if parent.mem_id == scope_id:
+                        candidates.scope_section.append(text)
+                    parent = parent.parent
+            elif node.attributes.get('type') == 'application/json':
+                candidates.json_scripts.append(self._script_text(node))
+        return candidates
+
+
+DOCUMENT_CLASSES = {
+    'selectolax': SelectolaxDocument,
+    'lxml': LxmlDocument,
+    'html.parser': BeautifulSoupDocument,
+}
+
+
+def parse_html(html, engine='auto'):
+    """使用指定的引擎解析HTML，返回统一接口的文档对象"""
+    return DOCUMENT_CLASSES[resolve_engine(engine)](html)
@@ -0,0 +1,138 @@
+import asyncio
+import threading
+import time
+from urllib.parse import urlsplit
+
+# 速率调整参数（AIMD：健康时加性增加，出错或变慢时乘性减少）
+INCREASE_STEP = 0.05  # 每次成功响应增加的请求数/秒（相对于起始速率的比例）
+DECREASE_FACTOR = 0.5  # 遇到429/5xx/超慢响应时速率乘以此系数
+MIN_RATE_FACTOR = 0.1  # 速率下限为起始速率乘以此系数
+SLOW_FACTOR = 3.0  # 响应时间超过平均值的此倍数视为变慢
+LATENCY_ALPHA = 0.2  # 平均响应时间的指数平滑系数
+MIN_LATENCY_SAMPLES = 5  # 平均响应时间至少基于这么多样本才用于判断变慢
+
+# 视为服务端过载的HTTP状态码
+THROTTLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+    """令牌桶：以rate个/秒的速度补充令牌，最多积累burst个"""
+    def __init__(self, rate, burst=1, max_rate=None):
+        self.initial_rate = rate
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.max_rate = max_rate or rate
+        self.min_rate = rate * MIN_RATE_FACTOR
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0  # 服务端要求等待（Retry-After）时在此之前不发请求
+        self.last_decrease = 0.0
+        self.latency = None  # 平均响应时间
+        self.samples = 0
+
+    def reserve(self, now):
+        """预留一个令牌，返回需要等待的秒数"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(wait, self.paused_until - now)
+
+    def is_slow(self, elapsed):
+        """根据平均响应时间判断本次响应是否明显变慢，并更新平均值"""
+        slow = (self.samples >= MIN_LATENCY_SAMPLES and self.latency is not None
+                and elapsed > self.latency * SLOW_FACTOR)
+        if not slow:
+            # 变慢的样本不计入平均值，避免平均值被拖高后失去判断能力
+            self.latency = elapsed if self.latency is None else (
+                LATENCY_ALPHA * elapsed + (1 - LATENCY_ALPHA) * self.latency)
+            self.samples += 1
+        return slow
+
+    def increase(self):
+        self.rate = min(self.max_rate, self.rate + self.initial_rate * INCREASE_STEP)
+
+    def decrease(self, now):
+        """乘性减少速率，一个请求间隔内只减少一次，避免同一波错误把速率压到底"""
+        if now - self.last_decrease < 1.0 / self.rate:
+            return
+        self.rate = max(self.min_rate, self.rate * DECREASE_FACTOR)
+        self.last_decrease = now
+
+
+class RateLimiter:
+    """全局和按主机的令牌桶限速器，根据响应状态和响应时间自适应调整速率（AIMD）"""
+    def __init__(self, rate=None, per_host_rate=None, max_rate=None, burst=1):
+        self.rate = rate
+        self.per_host_rate = per_host_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._global = TokenBucket(rate, burst, max_rate) if rate else None
+        self._hosts = {}
+
+    @property
+    def enabled(self):
+        return bool(self._global or self.per_host_rate)
+
+    def _host_bucket(self, host):
+        """获取主机对应的令牌桶，未设置按主机限速时返回None，调用方需持有锁"""
+        if not self.per_host_rate:
+            return None
+        bucket = self._hosts.get(host)
+        if bucket is None:
+            max_rate = max(self.per_host_rate, self.max_rate or 0) if self.max_rate else None
+            bucket = TokenBucket(self.per_host_rate, self.burst, max_rate)
+            self._hosts[host] = bucket
+        return bucket
+
+    def _buckets(self, url):
+        buckets = [self._global, self._host_bucket(urlsplit(url).netloc)]
+        return [bucket for bucket in buckets if bucket]
+
+    def _reserve(self, url):
+        """在全局和主机令牌桶中各预留一个令牌，返回需要等待的秒数"""
+        if not self.enabled:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            return max([bucket.reserve(now) for bucket in self._buckets(url)] or [0.0])
+
+    def acquire(self, url):
+        """阻塞直到可以向url发送请求，返回等待的秒数"""
+        wait = self._reserve(url)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, url):
+        """异步等待直到可以向url发送请求，返回等待的秒数"""
+        wait = self._reserve(url)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def record(self, url, status=None, elapsed=None, error=False, retry_after=None):
+        """记录一次请求的结果：429/5xx、出错或明显变慢时降速，否则缓慢提速"""
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for bucket in self._buckets(url):
+                throttled = error or status in THROTTLE_STATUS_CODES
+                if elapsed is not None and bucket.is_slow(elapsed):
+                    throttled = True
+                if throttled:
+                    bucket.decrease(now)
+                else:
+                    bucket.increase()
+                if retry_after:
+                    bucket.paused_until = max(bucket.paused_until, now + retry_after)
+
+
+def parse_retry_after(value):
+    """解析Retry-After响应头中的秒数，HTTP日期格式或无法解析时返回None"""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
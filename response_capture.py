@@ -0,0 +1,107 @@
+import base64
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Selenium性能日志的Chrome能力设置，捕获模式下需要在启动前设置
+PERFORMANCE_LOG_CAPABILITY = ('goog:loggingPrefs', {'performance': 'ALL'})
+
+
+def is_json_response(content_type):
+    """响应的Content-Type是否为JSON"""
+    return 'json' in (content_type or '').lower()
+
+
+class CapturedPage(str):
+    """浏览器捕获的JSON响应：字符串内容为响应列表的JSON（可直接写入调试文件），payloads为解码后的数据"""
+    def __new__(cls, payloads):
+        page = super().__new__(cls, json.dumps(payloads, ensure_ascii=False))
+        page.payloads = payloads
+        return page
+
+
+class PlaywrightCapture:
+    """在导航期间记录Playwright页面的JSON响应，导航结束后再读取响应体"""
+    def __init__(self, page):
+        self.page = page
+        self.responses = []
+
+    def _on_response(self, response):
+        # 事件回调中只记录响应对象，读取响应体放到回调之外，避免阻塞事件分发
+        try:
+            if is_json_response(response.headers.get('content-type')):
+                self.responses.append(response)
+        except Exception:
+            pass
+
+    def start(self):
+        self.page.on('response', self._on_response)
+        return self
+
+    def stop(self):
+        try:
+            self.page.remove_listener('response', self._on_response)
+        except Exception:
+            pass
+
+    def payloads(self):
+        """停止记录并返回已解码的JSON响应，无法读取的响应跳过"""
+        self.stop()
+        payloads = []
+        for response in self.responses:
+            try:
+                payloads.append(response.json())
+            except Exception as e:
+                logger.debug(f"读取响应体失败: {response.url}, 错误: {e}")
+        return payloads
+
+    async def payloads_async(self):
+        """payloads的异步版本"""
+        self.stop()
+        payloads = []
+        for response in self.responses:
+            try:
+                payloads.append(await response.json())
+            except Exception as e:
+                logger.debug(f"读取响应体失败: {response.url}, 错误: {e}")
+        return payloads
+
+
+class SeleniumCapture:
+    """通过Chrome性能日志找到导航期间的JSON响应，再用CDP Network.getResponseBody读取响应体"""
+    def __init__(self, driver):
+        self.driver = driver
+
+    def start(self):
+        """丢弃之前积累的性能日志，只保留本次导航的响应"""
+        self.driver.get_log('performance')
+        return self
+
+    def _json_request_ids(self):
+        request_ids = []
+        for entry in self.driver.get_log('performance'):
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, TypeError, ValueError):
+                continue
+            if message.get('method') != 'Network.responseReceived':
+                continue
+            params = message.get('params', {})
+            if is_json_response(params.get('response', {}).get('mimeType')):
+                request_ids.append(params.get('requestId'))
+        return request_ids
+
+    def payloads(self):
+        """返回已解码的JSON响应，响应体已被释放或无法解码的跳过"""
+        payloads = []
+        for request_id in self._json_request_ids():
+            try:
+                result = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+                body = result.get('body', '')
+                if result.get('base64Encoded'):
+                    body = base64.b64decode(body).decode('utf-8')
+                payloads.append(json.loads(body))
+            except Exception as e:
+                logger.debug(f"读取响应体失败: {request_id}, 错误: {e}")
+        return payloads
@@ -1,7 +1,8 @@
 import requests
 import time
 import json
-from bs4 import BeautifulSoup
+from http_session import create_session
+from parser_backend import parse_html
 
 # 尝试导入crawl4ai
 try:
@@ -15,6 +16,16 @@ except ImportError:
 # 配置代理
 proxy = {'http': 'http://127.0.0.1:10808', 'https': 'https://127.0.0.1:10808'}
 
+# 复用keep-alive连接的HTTP会话，所有测试URL共享同一个连接池
+session = create_session(
+    headers={
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.5',
+    },
+    proxy=proxy
+)
+
 # 测试URL
 test_urls = [
     'https://www.hackerone.com/opportunities/all',
@@ -32,7 +43,7 @@ def parse_domains(html, url):
         print(f"✗ 页面内容为空: {url}")
         return []
     
-    soup = BeautifulSoup(html, 'html.parser')
+    doc = parse_html(html)
     domains = set()
     
     # 检查是否需要JavaScript
@@ -40,10 +51,8 @@ def parse_domains(html, url):
         print("⚠️  检测到页面需要JavaScript")
         
     # 尝试从script标签中提取JSON数据
-    script_tags = soup.find_all('script', type='application/json')
-    for script in script_tags:
+    for script_content in doc.json_scripts():
         try:
-            script_content = script.string
             if script_content:
                 # 简单检查是否包含项目数据
                 if 'opportunities' in script_content or 'programs' in script_content:
@@ -57,21 +66,18 @@ def parse_domains(html, url):
             print(f"解析script标签时出错: {e}")
     
     # 尝试查找域名相关的元素
-    domain_elements = soup.find_all('code')
-    if domain_elements:
-        print(f"✓ 找到 {len(domain_elements)} 个code标签")
-        for elem in domain_elements[:10]:  # 只显示前10个
-            text = elem.get_text(strip=True)
+    code_texts = doc.code_texts()
+    if code_texts:
+        print(f"✓ 找到 {len(code_texts)} 个code标签")
+        for text in code_texts[:10]:  # 只显示前10个
             if '.' in text and len(text) > 3:
                 print(f"   可能的域名: {text}")
     
     # 查找data-qa属性为target-domains的元素
-    target_domains_section = soup.find('div', {'data-qa': 'target-domains'})
-    if target_domains_section:
+    target_domain_codes = doc.first_div_codes(data_qa='target-domains')
+    if target_domain_codes is not None:
         print("✓ 找到data-qa='target-domains'的元素")
-        code_elements = target_domains_section.find_all('code')
-        for code in code_elements:
-            domain = code.get_text(strip=True)
+        for domain in target_domain_codes:
             if domain and '.' in domain:
                 domains.add(domain)
                 print(f"   + 提取到域名: {domain}")
@@ -79,12 +85,10 @@ def parse_domains(html, url):
         print("✗ 未找到data-qa='target-domains'的元素")
     
     # 查找class为program-scope__target-domains的元素
-    program_scope_section = soup.find('div', class_='program-scope__target-domains')
-    if program_scope_section:
+    program_scope_codes = doc.first_div_codes(class_name='program-scope__target-domains')
+    if program_scope_codes is not None:
         print("✓ 找到class='program-scope__target-domains'的元素")
-        code_elements = program_scope_section.find_all('code')
-        for code in code_elements:
-            domain = code.get_text(strip=True)
+        for domain in program_scope_codes:
             if domain and '.' in domain:
                 domains.add(domain)
                 print(f"   + 提取到域名: {domain}")
@@ -149,13 +153,7 @@ def crawl_with_requests(url):
     """使用基本HTTP请求爬取页面"""
     print(f"\n====== 开始使用requests爬取: {url} ======")
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-        }
-        
-        response = requests.get(url, headers=headers, proxies=proxy if proxy else None, timeout=30)
+        response = session.get(url, timeout=30)
         response.raise_for_status()
         
         print(f"✓ requests爬取成功，状态码: {response.status_code}，页面大小: {len(response.text)} 字符")
@@ -0,0 +1,168 @@
+import csv
+import sqlite3
+import threading
+import time
+
+# 缓冲区中的待写入记录达到此数量时自动提交一个事务
+DEFAULT_BATCH_SIZE = 500
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS programs (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    handle TEXT,
+    updated_at TEXT,
+    last_crawled_at REAL,
+    last_run INTEGER
+);
+CREATE TABLE IF NOT EXISTS scope_assets (
+    id INTEGER PRIMARY KEY,
+    program_id INTEGER NOT NULL REFERENCES programs(id),
+    domain TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    last_run INTEGER NOT NULL,
+    UNIQUE (domain, program_id)
+);
+CREATE INDEX IF NOT EXISTS idx_scope_assets_program ON scope_assets (program_id, last_run);
+CREATE TABLE IF NOT EXISTS crawl_attempts (
+    id INTEGER PRIMARY KEY,
+    program_id INTEGER NOT NULL REFERENCES programs(id),
+    attempted_at REAL NOT NULL,
+    status TEXT NOT NULL,
+    domain_count INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_crawl_attempts_program ON crawl_attempts (program_id, attempted_at);
+'''
+
+
+class SqliteStore:
+    """SQLite结果存储：项目、范围资产和爬取记录分表保存，写入先缓冲再按批次在事务中提交"""
+    def __init__(self, path, batch_size=DEFAULT_BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        # 本次运行的编号：每个项目最近一次运行中出现的资产才算当前范围
+        self.run_id = int(time.time() * 1000)
+        self._programs = []  # 待写入的(项目URL, 更新时间, 时间)
+        self._assets = []  # 待写入的(项目URL, 域名, 时间)
+        self._attempts = []  # 待写入的(项目URL, 时间, 状态, 域名数, 错误)
+
+    def _pending(self):
+        return len(self._programs) + len(self._assets) + len(self._attempts)
+
+    def record_domains(self, program_url, domains, updated_at=None):
+        """缓冲一个项目的域名，缓冲区满时自动提交"""
+        now = time.time()
+        with self._lock:
+            self._programs.append((program_url, updated_at, now))
+            self._assets.extend((program_url, domain, now) for domain in domains)
+            if self._pending() >= self.batch_size:
+                self._flush()
+
+    def record_attempt(self, program_url, status, domain_count=0, error=None):
+        """缓冲一条项目爬取记录"""
+        with self._lock:
+            self._attempts.append((program_url, time.time(), status, domain_count, error))
+            if self._pending() >= self.batch_size:
+                self._flush()
+
+    def flush(self):
+        """在一个事务中提交所有缓冲的写入"""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        """提交缓冲区，调用方需持有锁"""
+        if not self._pending():
+            return
+        program_urls = {url for url, _, _ in self._programs}
+        program_urls.update(url for url, _, _ in self._assets)
+        program_urls.update(attempt[0] for attempt in self._attempts)
+        with self._conn:
+            self._conn.executemany(
+                'INSERT INTO programs (url, handle) VALUES (?, ?) ON CONFLICT(url) DO NOTHING',
+                [(url, url.rstrip('/').rsplit('/', 1)[-1]) for url in program_urls]
+            )
+            self._conn.executemany(
+                '''UPDATE programs SET updated_at = COALESCE(?, updated_at), last_crawled_at = ?, last_run = ?
+                   WHERE url = ?''',
+                [(updated_at, now, self.run_id, url) for url, updated_at, now in self._programs]
+            )
+            self._conn.executemany(
+                '''INSERT INTO scope_assets (program_id, domain, first_seen, last_seen, last_run)
+                   SELECT id, ?, ?, ?, ? FROM programs WHERE url = ?
+                   ON CONFLICT(domain, program_id) DO UPDATE SET last_seen = excluded.last_seen, last_run = excluded.last_run''',
+                [(domain, now, now, self.run_id, url) for url, domain, now in self._assets]
+            )
+            self._conn.executemany(
+                '''INSERT INTO crawl_attempts (program_id, attempted_at, status, domain_count, error)
+                   SELECT id, ?, ?, ?, ? FROM programs WHERE url = ?''',
+                [(attempted_at, status, count, error, url) for url, attempted_at, status, count, error in self._attempts]
+            )
+        self._programs.clear()
+        self._assets.clear()
+        self._attempts.clear()
+
+    def current_assets(self):
+        """按域名排序逐行返回(域名, 项目URL)：只包含项目最近一次运行中出现的资产，同一域名取最近出现的项目"""
+        self.flush()
+        # 使用独立的只读连接逐行读取，结果集不整体载入内存，也不阻塞写入
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.execute(
+                '''SELECT a.domain, p.url FROM scope_assets a JOIN programs p ON p.id = a.program_id
+                   WHERE a.last_run = p.last_run
+                   ORDER BY a.domain, a.last_seen DESC'''
+            )
+            last_domain = None
+            for domain, url in cursor:
+                if domain != last_domain:
+                    last_domain = domain
+                    yield domain, url
+        finally:
+            conn.close()
+
+    def program_domains(self, program_url):
+        """项目在已提交的最近一次运行中出现的域名，没有记录过域名时返回None
+
+        只读取已提交的数据，不提交缓冲区，用于复用上次运行的结果
+        """
+        with self._lock:
+            row = self._conn.execute('SELECT last_run FROM programs WHERE url = ?', (program_url,)).fetchone()
+            if row is None or row[0] is None:
+                return None
+            return [domain for domain, in self._conn.execute(
+                '''SELECT a.domain FROM scope_assets a JOIN programs p ON p.id = a.program_id
+                   WHERE p.url = ? AND a.last_run = p.last_run ORDER BY a.id''', (program_url,)
+            )]
+
+    def count_domains(self):
+        """当前范围中的不同域名数"""
+        with self._lock:
+            self._flush()
+            return self._conn.execute(
+                '''SELECT COUNT(DISTINCT a.domain) FROM scope_assets a JOIN programs p ON p.id = a.program_id
+                   WHERE a.last_run = p.last_run'''
+            ).fetchone()[0]
+
+    def export_csv(self, path):
+        """将当前范围流式导出为CSV，返回导出的行数"""
+        count = 0
+        with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['domain', 'url'])
+            for row in self.current_assets():
+                writer.writerow(row)
+                count += 1
+        return count
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._conn.close()
@@ -0,0 +1,102 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from crawl_hackerone_domains import HackerOneScraper
+
+# 本地模拟数据：25个项目，每个项目4个范围资产（其中一个不可提交、两个不是域名）
+PROGRAM_COUNT = 25
+CSRF_TOKEN = 'test-csrf-token'
+
+
+def program_scopes(handle):
+    return [
+        {'identifier': f'{handle}.example.com', 'display_name': 'Domain', 'asset_type': 'URL', 'eligible_for_submission': True},
+        {'identifier': f'api.{handle}.example.com', 'display_name': 'Domain', 'asset_type': 'URL', 'eligible_for_submission': False},
+        {'identifier': 'com.example.app', 'display_name': 'Android', 'asset_type': 'GOOGLE_PLAY_APP_ID', 'eligible_for_submission': True},
+        {'identifier': 'Source code', 'display_name': 'Other', 'asset_type': 'SOURCE_CODE', 'eligible_for_submission': True},
+    ]
+
+
+class GraphQLHandler(BaseHTTPRequestHandler):
+    """模拟HackerOne的/current_user和/graphql接口"""
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, data, status=200):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/current_user':
+            self._send_json({'csrf_token': CSRF_TOKEN})
+        else:
+            self._send_json({'error': 'not found'}, status=404)
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        if self.headers.get('X-Csrf-Token') != CSRF_TOKEN:
+            self._send_json({'errors': [{'message': 'invalid csrf token'}]}, status=403)
+            return
+
+        variables = payload['variables']
+        start, size = variables['from'], variables['size']
+        if payload['operationName'] == 'DiscoveryQuery':
+            nodes = [{'id': str(i), 'handle': f'program{i}', 'name': f'Program {i}', 'last_updated_at': '2024-01-01T00:00:00Z'}
+                     for i in range(PROGRAM_COUNT)]
+            self._send_json({'data': {'opportunities_search': {'nodes': nodes[start:start + size], 'total_count': len(nodes)}}})
+        elif payload['operationName'] == 'PolicySearchStructuredScopesQuery':
+            nodes = program_scopes(variables['handle'])
+            self._send_json({'data': {'team': {'structured_scopes_search': {'nodes': nodes[start:start + size], 'total_count': len(nodes)}}}})
+        else:
+            self._send_json({'errors': [{'message': 'unknown operation'}]}, status=400)
+
+
+def run_api_crawl(output_file, **kwargs):
+    """启动本地模拟服务器，以API模式运行一次完整爬取"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), GraphQLHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        scraper = HackerOneScraper(
+            output_file=output_file,
+            request_delay=(0, 0),
+            use_api=True,
+            api_page_size=10,  # 小于项目总数，覆盖分页逻辑
+            base_url=f'http://127.0.0.1:{server.server_port}',
+            **kwargs
+        )
+        scraper.run()
+        return scraper
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_api_mode():
+    for kwargs in ({}, {'workers': 4}, {'use_async': True, 'concurrency': 8}):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            scraper = run_api_crawl(os.path.join(tmpdir, 'domains.csv'), **kwargs)
+            expected = {f'program{i}.example.com' for i in range(PROGRAM_COUNT)}
+            assert scraper.domains == expected, kwargs
+            assert scraper.domain_url_map['program3.example.com'].endswith('/program3')
+
+
+if __name__ == "__main__":
+    print("=== 测试API模式 ===")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        scraper = run_api_crawl(os.path.join(tmpdir, 'domains.csv'), workers=4)
+        print(f"获取到 {len(scraper.domains)} 个域名 (期望 {PROGRAM_COUNT} 个)")
+        for domain in sorted(scraper.domains)[:5]:
+            print(f"  {domain} -> {scraper.domain_url_map[domain]}")
+    print("\n测试完成!")
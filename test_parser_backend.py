@@ -0,0 +1,93 @@
+import os
+import sys
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from parser_backend import (SCOPE_SECTION_CLASS, TARGET_DOMAINS_QA, available_engines, parse_html,
+                            resolve_scope)
+
+REFERENCE_PAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hackerone_page.html')
+
+# 各解析引擎容易产生差异的页面
+EDGE_CASE_PAGES = {
+    'empty': '',
+    'comments': f'''<html><body>
+        <!-- <code>commented.example.com</code> <a href="/commented">x</a> -->
+        <div data-qa="{TARGET_DOMAINS_QA}"><!-- note --><code>a.example.com</code><code><!-- x -->b.example.com</code></div>
+        </body></html>''',
+    'nested_code': f'''<html><body>
+        <div data-qa="{TARGET_DOMAINS_QA}"><code>outer<code>inner.example.com</code></code>
+            <code> spaced .example.com </code><code><b>bold</b>.example.com</code></div>
+        <div class="x {SCOPE_SECTION_CLASS} y"><div><code>deep.example.com</code></div></div>
+        </body></html>''',
+    'scope_section_only': f'''<html><body>
+        <div class="{SCOPE_SECTION_CLASS}"><code>first.example.com</code></div>
+        <div class="{SCOPE_SECTION_CLASS}"><code>second.example.com</code></div>
+        <code>not a domain</code><code>loose.example.com</code>
+        </body></html>''',
+    'empty_sections': f'''<html><body>
+        <div data-qa="{TARGET_DOMAINS_QA}"></div><div class="{SCOPE_SECTION_CLASS}"><code></code></div>
+        <code>fallback.example.com</code>
+        </body></html>''',
+    'hrefs': '''<html><body>
+        <a href="">empty</a><a href="/program-a">a</a><a>no href</a><a href="/login">login</a>
+        <a href="/program-b?type=team">query</a><a href="https://hackerone.com/program-c">abs</a>
+        <a href=" /spaced ">spaced</a><a href="/program-a">dup</a>
+        </body></html>''',
+    'json_scripts': '''<html><head>
+        <script type="application/json">{"props": {"pageProps": {"program": {"targets": {"in_scope": [
+            {"asset_identifier": "json.example.com"}]}}}}}</script>
+        <script type="application/json"></script>
+        <script type="text/javascript">var x = "<code>script.example.com</code>";</script>
+        </head><body></body></html>''',
+    'unclosed': f'''<div data-qa="{TARGET_DOMAINS_QA}"><code>open.example.com<p>para
+        <code>next.example.com</code><a href="/unclosed">''',
+}
+
+
+def extract(html, engine):
+    """用指定引擎提取解析器使用的所有结果"""
+    document = parse_html(html, engine)
+    candidates = document.scope_candidates()
+    return {
+        'json_scripts': document.json_scripts(),
+        'target_domains': document.first_div_codes(data_qa=TARGET_DOMAINS_QA),
+        'scope_section': document.first_div_codes(class_name=SCOPE_SECTION_CLASS),
+        'code_texts': document.code_texts(),
+        'hrefs': document.hrefs(),
+        'candidates': (candidates.target_domains, candidates.scope_section, candidates.codes, candidates.json_scripts),
+        'scope': resolve_scope(candidates),
+    }
+
+
+def comparison_pages():
+    """所有测试页面：参考页面和边界情况"""
+    pages = dict(EDGE_CASE_PAGES)
+    if os.path.exists(REFERENCE_PAGE):
+        with open(REFERENCE_PAGE, 'r', encoding='utf-8') as f:
+            pages['reference'] = f.read()
+    return pages
+
+
+def test_engines_agree():
+    engines = available_engines()
+    assert 'html.parser' in engines
+    for name, html in comparison_pages().items():
+        expected = extract(html, 'html.parser')
+        for engine in engines:
+            result = extract(html, engine)
+            for key, value in expected.items():
+                assert result[key] == value, f"{name}: {engine}的{key}与html.parser不同: {result[key]!r} != {value!r}"
+
+
+if __name__ == "__main__":
+    print("=== 测试解析引擎结果一致性 ===")
+    print(f"可用引擎: {', '.join(available_engines())}")
+    for name, html in comparison_pages().items():
+        results = {engine: extract(html, engine) for engine in available_engines()}
+        expected = results['html.parser']
+        differences = [f"{engine}.{key}" for engine, result in results.items()
+                       for key in expected if result[key] != expected[key]]
+        print(f"  {name}: {'一致' if not differences else '不一致: ' + ', '.join(differences)}")
+    print("\n测试完成!")